@@ -4,8 +4,11 @@
 Batch preprocessing for all patients in a directory
 """
 import sys
+import atexit
+import queue
 import argparse
 import logging
+import logging.handlers
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
@@ -26,18 +29,26 @@ def main():
                        help='Process sequentially instead of parallel')
     parser.add_argument('--workers', type=int, default=4, 
                        help='Number of parallel workers')
+    parser.add_argument('--force-reprocess', action='store_true', 
+                       help='Reprocess patients whose outputs are already up to date')
     
     args = parser.parse_args()
     
-    # Setup logging
-    logging.basicConfig(
-        level=logging.INFO, 
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.StreamHandler(),
-            logging.FileHandler(Path(args.output_dir) / 'preprocessing.log')
-        ]
-    )
+    # Setup logging: records are queued and written by a background listener
+    log_queue = queue.Queue(-1)
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.setFormatter(logging.Formatter('%(message)s'))  # Final format applied by listener
+    logging.basicConfig(level=logging.INFO, handlers=[queue_handler])
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    output_handlers = [
+        logging.StreamHandler(),
+        logging.FileHandler(Path(args.output_dir) / 'preprocessing.log')
+    ]
+    for handler in output_handlers:
+        handler.setFormatter(formatter)
+    listener = logging.handlers.QueueListener(log_queue, *output_handlers, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
     
     print("🏥 Batch Medical Image Preprocessing Pipeline")
     print(f"📁 Input directory: {args.input_dir}")
@@ -54,7 +65,8 @@ def main():
         standardization_method=args.standardization,
         enable_segmentation=not args.no_segmentation,
         parallel_processing=not args.sequential,
-        max_workers=args.workers
+        max_workers=args.workers,
+        force_reprocess=args.force_reprocess
     )
     
     # Run pipeline
@@ -70,32 +82,36 @@ def main():
         # Print summary
         batch_results = results['step_results'].get('BatchProcessingStep', {}).get('result', {})
         
-        print("\n🎯 Batch Processing Complete!")
-        print(f"✅ Successful: {len(batch_results.get('successful', []))}")
-        print(f"❌ Failed: {len(batch_results.get('failed', []))}")
+        lines = []
+        lines.append("\n🎯 Batch Processing Complete!")
+        lines.append(f"✅ Successful: {len(batch_results.get('successful', []))}")
+        lines.append(f"❌ Failed: {len(batch_results.get('failed', []))}")
         
         if batch_results.get('successful'):
-            print("\n✅ Successfully processed:")
+            lines.append("\n✅ Successfully processed:")
             for patient in batch_results['successful'][:5]:
-                print(f"   - {patient}")
+                lines.append(f"   - {patient}")
             if len(batch_results['successful']) > 5:
-                print(f"   - ... and {len(batch_results['successful']) - 5} more")
+                lines.append(f"   - ... and {len(batch_results['successful']) - 5} more")
         
         if batch_results.get('failed'):
-            print("\n❌ Failed to process:")
+            lines.append("\n❌ Failed to process:")
             for patient in batch_results['failed'][:5]:
-                print(f"   - {patient}")
+                lines.append(f"   - {patient}")
             if len(batch_results['failed']) > 5:
-                print(f"   - ... and {len(batch_results['failed']) - 5} more")
+                lines.append(f"   - ... and {len(batch_results['failed']) - 5} more")
         
         # Report locations
         reporting_results = results['step_results'].get('BatchReportingStep', {}).get('result', {})
         if reporting_results:
-            print(f"\n📋 Reports saved to: {reporting_results['reports_directory']}")
-            print(f"   - Summary: {Path(reporting_results['summary_path']).name}")
-            print(f"   - Results CSV: {Path(reporting_results['csv_path']).name}")
+            lines.append(f"\n📋 Reports saved to: {reporting_results['reports_directory']}")
+            lines.append(f"   - Summary: {Path(reporting_results['summary_path']).name}")
+            lines.append(f"   - Results CSV: {Path(reporting_results['csv_path']).name}")
+        
+        lines.append("\n🎉 All processing complete!")
         
-        print("\n🎉 All processing complete!")
+        # Emit the whole summary with a single write
+        sys.stdout.write("\n".join(lines) + "\n")
         
     except Exception as e:
         print(f"\n❌ Pipeline failed: {e}")
@@ -2,9 +2,14 @@
 """
 Explore and validate prostate data structure
 """
+import os
 from pathlib import Path
 import sys
 
+# Expected per-patient file name suffixes
+_ADC_SUFFIX = "_adc.nii.gz"
+_T2W_SUFFIX = "_t2w.nii.gz"
+
 def explore_patient_data(data_directory: str, max_patients: int = 10):
     """
     Explore and validate the patient data structure
@@ -23,16 +28,18 @@ def explore_patient_data(data_directory: str, max_patients: int = 10):
     print(f"📁 Exploring data in: {data_directory}")
     print("=" * 70)
     
-    # Find patient directories
-    patient_dirs = [d for d in data_path.iterdir() if d.is_dir() and not d.name.startswith('.')]
-    patient_dirs.sort()
+    # Find patient directories (single directory sweep; symlinked folders are followed)
+    with os.scandir(data_path) as it:
+        patient_dirs = [e for e in it if e.is_dir() and not e.name.startswith('.')]
+    patient_dirs.sort(key=lambda e: e.name)
     
     print(f"📊 Found {len(patient_dirs)} total directories")
     print()
     
     # Analyze patient data
     complete_patients = []
-    incomplete_patients = []
+    incomplete_count = 0
+    incomplete_preview = []  # Only the first few are reported
     
     # Check first N patients in detail
     patients_to_check = patient_dirs[:max_patients]
@@ -43,26 +50,27 @@ def explore_patient_data(data_directory: str, max_patients: int = 10):
     for patient_dir in patients_to_check:
         patient_id = patient_dir.name
         
-        # Expected files
-        adc_file = patient_dir / f"{patient_id}_adc.nii.gz"
-        t2w_file = patient_dir / f"{patient_id}_t2w.nii.gz"
+        # List the patient folder once and check files by name
+        with os.scandir(patient_dir.path) as sub:
+            names = {f.name for f in sub if f.name.endswith('.nii.gz')}
         
-        # Check what files exist
-        all_files = list(patient_dir.glob("*.nii.gz"))
+        # Expected files
+        adc_name = patient_id + _ADC_SUFFIX
+        t2w_name = patient_id + _T2W_SUFFIX
         
-        has_adc = adc_file.exists()
-        has_t2w = t2w_file.exists()
+        has_adc = adc_name in names
+        has_t2w = t2w_name in names
         is_complete = has_adc and has_t2w
         
         status_emoji = "✅" if is_complete else "❌"
         status_text = "READY" if is_complete else "INCOMPLETE"
         
         print(f"{status_emoji} Patient {patient_id}: {status_text}")
-        print(f"   📄 ADC: {'✅' if has_adc else '❌'} {adc_file.name}")
-        print(f"   📄 T2W: {'✅' if has_t2w else '❌'} {t2w_file.name}")
+        print(f"   📄 ADC: {'✅' if has_adc else '❌'} {adc_name}")
+        print(f"   📄 T2W: {'✅' if has_t2w else '❌'} {t2w_name}")
         
         # Show other files
-        other_files = [f.name for f in all_files if f not in [adc_file, t2w_file]]
+        other_files = sorted(names - {adc_name, t2w_name})
         if other_files:
             print(f"   📋 Other files: {', '.join(other_files)}")
         
@@ -71,53 +79,61 @@ def explore_patient_data(data_directory: str, max_patients: int = 10):
         if is_complete:
             complete_patients.append(patient_id)
         else:
-            incomplete_patients.append(patient_id)
+            incomplete_count += 1
+            if len(incomplete_preview) < 5:
+                incomplete_preview.append(patient_id)
     
     # Quick check remaining patients
     if len(patient_dirs) > max_patients:
         print(f"🔍 Quick check of remaining {len(patient_dirs) - max_patients} patients...")
         
+        scandir = os.scandir
         for patient_dir in patient_dirs[max_patients:]:
             patient_id = patient_dir.name
-            adc_file = patient_dir / f"{patient_id}_adc.nii.gz"
-            t2w_file = patient_dir / f"{patient_id}_t2w.nii.gz"
+            with scandir(patient_dir.path) as sub:
+                names = {f.name for f in sub}
             
-            if adc_file.exists() and t2w_file.exists():
+            if patient_id + _ADC_SUFFIX in names and patient_id + _T2W_SUFFIX in names:
                 complete_patients.append(patient_id)
             else:
-                incomplete_patients.append(patient_id)
-    
-    # Summary
-    print("=" * 70)
-    print("📈 SUMMARY:")
-    print(f"   🎯 Total patients analyzed: {len(patient_dirs)}")
-    print(f"   ✅ Complete (ready for registration): {len(complete_patients)}")
-    print(f"   ❌ Incomplete (missing files): {len(incomplete_patients)}")
-    print(f"   📊 Completeness rate: {len(complete_patients)/len(patient_dirs):.1%}")
+                incomplete_count += 1
+                if len(incomplete_preview) < 5:
+                    incomplete_preview.append(patient_id)
+    
+    # Summary (collected and written in one go)
+    lines = []
+    lines.append("=" * 70)
+    lines.append("📈 SUMMARY:")
+    lines.append(f"   🎯 Total patients analyzed: {len(patient_dirs)}")
+    lines.append(f"   ✅ Complete (ready for registration): {len(complete_patients)}")
+    lines.append(f"   ❌ Incomplete (missing files): {incomplete_count}")
+    lines.append(f"   📊 Completeness rate: {len(complete_patients)/len(patient_dirs):.1%}")
     
     if complete_patients:
-        print(f"\n🚀 Ready for registration (first 10):")
+        lines.append(f"\n🚀 Ready for registration (first 10):")
         for patient in complete_patients[:10]:
-            print(f"   - {patient}")
+            lines.append(f"   - {patient}")
         if len(complete_patients) > 10:
-            print(f"   - ... and {len(complete_patients) - 10} more")
+            lines.append(f"   - ... and {len(complete_patients) - 10} more")
     
-    if incomplete_patients:
-        print(f"\n⚠️  Incomplete patients (first 5):")
-        for patient in incomplete_patients[:5]:
-            print(f"   - {patient}")
-        if len(incomplete_patients) > 5:
-            print(f"   - ... and {len(incomplete_patients) - 5} more")
+    if incomplete_count:
+        lines.append(f"\n⚠️  Incomplete patients (first 5):")
+        for patient in incomplete_preview:
+            lines.append(f"   - {patient}")
+        if incomplete_count > 5:
+            lines.append(f"   - ... and {incomplete_count - 5} more")
     
-    print(f"\n💡 Next steps:")
+    lines.append(f"\n💡 Next steps:")
     if complete_patients:
-        print("   1. Test registration with a single patient first")
-        print("   2. Run full batch processing when single test succeeds")
-        print("   3. Use examples/simple_registration.py")
+        lines.append("   1. Test registration with a single patient first")
+        lines.append("   2. Run full batch processing when single test succeeds")
+        lines.append("   3. Use examples/simple_registration.py")
     else:
-        print("   1. Check data directory structure")
-        print("   2. Ensure files follow naming convention: {patientID}_{sequence}.nii.gz")
-        print("   3. Verify file permissions and accessibility")
+        lines.append("   1. Check data directory structure")
+        lines.append("   2. Ensure files follow naming convention: {patientID}_{sequence}.nii.gz")
+        lines.append("   3. Verify file permissions and accessibility")
+    
+    sys.stdout.write("\n".join(lines) + "\n")
     
     return complete_patients
 
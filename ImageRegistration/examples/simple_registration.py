@@ -66,7 +66,8 @@ def register_adc_to_t2w_simple(patient_directory: str,
         print(f"📊 Success Rate: {summary['success_rate']:.1%}")
         print(f"⏱️  Total Time: {results['metadata']['total_execution_time']:.1f} seconds")
         print(f"📋 Error log: {summary['error_log_path']}")
-        print(f"📄 Full report: {output_directory}/registration_summary_report.json")
+        print(f"🗂️  Per-patient results: {summary['results_log_path']}")
+        print(f"📄 Full report: {output_directory}/registration_summary_report.json.gz")
         
         # Show some successful cases
         if batch_results['successful']:
@@ -5,13 +5,50 @@ Base pipeline framework for medical image processing
 """
 
 from abc import ABC, abstractmethod
-from typing import Dict, Any, List, Optional, Union
+from collections import ChainMap
+from typing import Dict, Any, List, Optional, Union, TextIO
 import logging
 import time
+import gc
 from pathlib import Path
 import json
 from datetime import datetime
 
+class StepRecord:
+    """Bookkeeping for a single executed step"""
+    
+    __slots__ = ('name', 'index', 'execution_time_ns', 'status', 'error', 'result')
+    
+    def __init__(self,
+                 name: str,
+                 index: int,
+                 execution_time_ns: int,
+                 status: str,
+                 error: Optional[str] = None,
+                 result: Any = None):
+        self.name = name
+        self.index = index
+        self.execution_time_ns = execution_time_ns
+        self.status = status
+        self.error = error
+        self.result = result
+    
+    @property
+    def execution_time(self) -> float:
+        """Execution time in seconds"""
+        return self.execution_time_ns / 1e9
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Step result entry as stored in results['step_results']"""
+        record = {
+            'result': self.result,
+            'execution_time': self.execution_time,
+            'status': self.status
+        }
+        if self.error is not None:
+            record['error'] = self.error
+        return record
+
 class PipelineStep(ABC):
     """Base class for pipeline steps"""
     
@@ -20,6 +57,7 @@ class PipelineStep(ABC):
         self.description = description
         self.logger = logging.getLogger(f"{__name__}.{name}")
         self.execution_time = 0
+        self.execution_time_ns = 0
         self.status = "pending"
         self.error_message = None
     
@@ -42,15 +80,32 @@ class BasePipeline(ABC):
     Provides common functionality like logging, error handling, progress tracking
     """
     
+    # Pause cyclic GC for the step loop and collect once at the end. Pipelines
+    # whose steps loop over a whole cohort turn this off, so the collector only
+    # pauses around the per-patient pipelines they run.
+    PAUSE_GC = True
+    
     def __init__(self, 
                  name: str,
                  description: str = "",
-                 log_level: str = "INFO"):
+                 log_level: str = "INFO",
+                 results_sink: Optional[TextIO] = None):
+        """
+        Args:
+            name: Pipeline name
+            description: Pipeline description
+            log_level: Logging level name
+            results_sink: Optional text stream; when set, each step record is
+                written to it as a JSON line as soon as the step finishes and
+                the step's result payload is not retained in step_results
+        """
         
         self.name = name
         self.description = description
         self.steps: List[PipelineStep] = []
         self.results = {}
+        self._step_records: List[StepRecord] = []
+        self.results_sink = results_sink
         self.start_time = None
         self.end_time = None
         self.status = "initialized"
@@ -66,29 +121,65 @@ class BasePipeline(ABC):
         # Error handling
         self.continue_on_error = False
         self.errors = []
+        
+        # Steps whose input validation already passed (see trust_inputs)
+        self._validated_steps = set()
     
     def add_step(self, step: PipelineStep) -> None:
         """Add a processing step to the pipeline"""
         self.steps.append(step)
         self.logger.info(f"Added step: {step.name}")
     
+    def _add_record(self, record: StepRecord) -> None:
+        """Keep a finished step record, streaming it to the results sink if set"""
+        if self.results_sink is not None:
+            self.results_sink.write(json.dumps({
+                'pipeline': self.name,
+                'step': record.name,
+                'index': record.index,
+                'status': record.status,
+                'execution_time': record.execution_time,
+                'error': record.error
+            }) + '\n')
+            # Downstream steps already received the payload via the data dict
+            record.result = None
+        
+        self._step_records.append(record)
+    
     def execute(self, 
                 input_data: Dict[str, Any],
                 continue_on_error: bool = False,
+                trust_inputs: bool = False,
                 **kwargs) -> Dict[str, Any]:
         """
         Execute the complete pipeline
+        
+        Args:
+            input_data: Initial data passed to the first step
+            continue_on_error: Keep running remaining steps after a failure
+            trust_inputs: Skip validate_inputs for steps that already passed
+                validation in an earlier run of this pipeline instance
+            **kwargs: Passed through to each step's execute
         """
         
         self.continue_on_error = continue_on_error
         self.start_time = time.time()
+        start_ns = time.perf_counter_ns()
         self.status = "running"
         self.current_step_index = 0
         
         self.logger.info(f"Starting pipeline: {self.name}")
         
         # Initialize results
-        current_data = input_data.copy()
+        # Step outputs go to an overlay; the caller's input dict is never copied or modified
+        current_data = ChainMap({}, input_data)
+        self._step_records = []
+        
+        # Instances are reused across runs (e.g. one per patient in a cohort);
+        # errors and step states describe this run only
+        self.errors = []
+        for step in self.steps:
+            step.status = "pending"
         self.results = {
             'input_data': input_data,
             'step_results': {},
@@ -99,19 +190,33 @@ class BasePipeline(ABC):
             }
         }
         
+        # Hoisted out of the step loop; messages are formatted lazily
+        logger = self.logger
+        log_steps = logger.isEnabledFor(logging.INFO)
+        num_steps = len(self.steps)
+        
+        # Step data is tree-shaped, so cyclic GC passes during the loop find
+        # nothing to free; pause the collector and run it once at the end
+        pause_gc = self.PAUSE_GC and gc.isenabled()
+        if pause_gc:
+            gc.disable()
+        
         try:
             # Execute each step sequentially
             for i, step in enumerate(self.steps):
                 self.current_step_index = i
-                self.logger.info(f"Executing step {i+1}/{len(self.steps)}: {step.name}")
+                if log_steps:
+                    logger.info("Executing step %d/%d: %s", i + 1, num_steps, step.name)
                 
-                step_start_time = time.time()
+                step_start_ns = time.perf_counter_ns()
                 step.status = "running"
                 
                 try:
                     # Validate inputs
-                    if not step.validate_inputs(current_data):
-                        raise ValueError(f"Input validation failed for step: {step.name}")
+                    if not (trust_inputs and step.name in self._validated_steps):
+                        if not step.validate_inputs(current_data):
+                            raise ValueError(f"Input validation failed for step: {step.name}")
+                        self._validated_steps.add(step.name)
                     
                     # Execute step
                     step_result = step.execute(current_data, **kwargs)
@@ -121,25 +226,18 @@ class BasePipeline(ABC):
                         current_data.update(step_result)
                     
                     # Record step execution
-                    step.execution_time = time.time() - step_start_time
+                    step.execution_time_ns = time.perf_counter_ns() - step_start_ns
+                    step.execution_time = step.execution_time_ns / 1e9
                     step.status = "completed"
                     
-                    self.results['step_results'][step.name] = {
-                        'result': step_result,
-                        'execution_time': step.execution_time,
-                        'status': 'success'
-                    }
-                    
-                    self.results['metadata']['steps_executed'].append({
-                        'name': step.name,
-                        'index': i,
-                        'execution_time': step.execution_time,
-                        'status': 'success'
-                    })
+                    self._add_record(StepRecord(
+                        step.name, i, step.execution_time_ns, 'success', result=step_result
+                    ))
                 
                 except Exception as e:
                     # Handle step failure
-                    step.execution_time = time.time() - step_start_time
+                    step.execution_time_ns = time.perf_counter_ns() - step_start_ns
+                    step.execution_time = step.execution_time_ns / 1e9
                     step.status = "failed"
                     step.error_message = str(e)
                     
@@ -151,14 +249,11 @@ class BasePipeline(ABC):
                     }
                     
                     self.errors.append(error_info)
-                    self.logger.error(f"Step {step.name} failed: {e}")
+                    logger.error("Step %s failed: %s", step.name, e)
                     
-                    self.results['step_results'][step.name] = {
-                        'result': None,
-                        'execution_time': step.execution_time,
-                        'status': 'failed',
-                        'error': str(e)
-                    }
+                    self._add_record(StepRecord(
+                        step.name, i, step.execution_time_ns, 'failed', error=str(e)
+                    ))
                     
                     if not self.continue_on_error:
                         raise
@@ -168,7 +263,7 @@ class BasePipeline(ABC):
                     try:
                         step.cleanup()
                     except Exception as cleanup_error:
-                        self.logger.warning(f"Cleanup failed for {step.name}: {cleanup_error}")
+                        logger.warning("Cleanup failed for %s: %s", step.name, cleanup_error)
             
             # Pipeline completed successfully
             self.status = "completed"
@@ -182,11 +277,28 @@ class BasePipeline(ABC):
             raise
         
         finally:
+            if pause_gc:
+                gc.enable()
+                gc.collect()
+            
             # Finalize results
+            self.results['step_results'] = {
+                record.name: record.to_dict() for record in self._step_records
+            }
+            self.results['metadata']['steps_executed'] = [
+                {
+                    'name': record.name,
+                    'index': record.index,
+                    'execution_time': record.execution_time,
+                    'status': record.status
+                }
+                for record in self._step_records if record.status == 'success'
+            ]
+            
             self.end_time = time.time()
             self.results['metadata'].update({
                 'end_time': self.end_time,
-                'total_execution_time': self.end_time - self.start_time,
+                'total_execution_time': (time.perf_counter_ns() - start_ns) / 1e9,
                 'status': self.status,
                 'errors': self.errors
             })
@@ -6,27 +6,42 @@ import os
 from pathlib import Path
 from typing import Dict, Any, List, Optional, Tuple
 import logging
+import logging.handlers
 import json
 import csv
 from datetime import datetime
 import concurrent.futures
+import multiprocessing
+import numpy as np
+import pandas as pd
 from tqdm import tqdm
 import SimpleITK as sitk
 
+try:
+    # Optional faster JSON encoder for the batch summary
+    import orjson
+except ImportError:
+    orjson = None
+
 from .base_pipeline import BasePipeline, PipelineStep
 from .comprehensive_pipeline import PreprocessingPipeline
+from ..preprocessing.standardization import NyulStandardizer, ZScoreStandardizer
 
 class BatchPreprocessingPipeline(BasePipeline):
     """
     Batch processing pipeline for entire patient directories
     """
     
+    # Runs a whole cohort; the collector stays active between patients
+    PAUSE_GC = False
+    
     def __init__(self,
                  registration_type: str = 'rigid',
                  standardization_method: str = 'nyul',
                  enable_segmentation: bool = True,
                  parallel_processing: bool = True,
-                 max_workers: Optional[int] = None):
+                 max_workers: Optional[int] = None,
+                 force_reprocess: bool = False):
         
         super().__init__(
             name="BatchPreprocessingPipeline",
@@ -41,12 +56,16 @@ class BatchPreprocessingPipeline(BasePipeline):
         
         # Setup steps
         self.add_step(PatientDiscoveryStep())
-        self.add_step(BatchStandardizationStep(method=standardization_method))
+        self.add_step(BatchStandardizationStep(
+            method=standardization_method,
+            max_workers=self.max_workers if parallel_processing else None
+        ))
         self.add_step(BatchProcessingStep(
             registration_type=registration_type,
             enable_segmentation=enable_segmentation,
             parallel=parallel_processing,
-            max_workers=self.max_workers
+            max_workers=self.max_workers,
+            force_reprocess=force_reprocess
         ))
         self.add_step(BatchReportingStep())
 
@@ -55,8 +74,15 @@ class PatientDiscoveryStep(PipelineStep):
     Discover all patients in the directory
     """
     
-    def __init__(self):
+    # Lowercased file name suffixes for the supported naming conventions:
+    # *_t2w / *_T2W / *t2 and *_adc / *_ADC / *adc
+    T2W_SUFFIXES = ('_t2w.nii.gz', 't2.nii.gz')
+    ADC_SUFFIXES = ('adc.nii.gz',)
+    
+    def __init__(self, max_workers: Optional[int] = None):
         super().__init__("PatientDiscoveryStep", "Discover all patients in directory")
+        # Directory probes are I/O-bound, so oversubscribe the CPU count
+        self.max_workers = max_workers or min(32, (os.cpu_count() or 1) * 4)
     
     def execute(self, data: Dict[str, Any], **kwargs) -> Dict[str, Any]:
         """
@@ -64,57 +90,17 @@ class PatientDiscoveryStep(PipelineStep):
         """
         base_dir = Path(data['base_directory'])
         
-        # Pattern matching for different naming conventions
-        patterns = [
-            ('*_t2w.nii.gz', '*_adc.nii.gz'),  # Pranav's convention
-            ('*_T2W.nii.gz', '*_ADC.nii.gz'),  # Alternative
-            ('*t2.nii.gz', '*adc.nii.gz'),     # Shorter version
-        ]
+        with os.scandir(base_dir) as entries:
+            patient_dirs = [
+                entry for entry in entries
+                if entry.is_dir() and not entry.name.startswith('.')
+            ]
         
-        patients = []
+        # Directory probes block on filesystem I/O, so overlap them with threads
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            found = list(executor.map(self._check_patient, patient_dirs))
         
-        # Find all patient directories
-        for patient_dir in base_dir.iterdir():
-            if not patient_dir.is_dir():
-                continue
-            
-            if patient_dir.name.startswith('.'):
-                continue
-            
-            patient_id = patient_dir.name
-            
-            # Check for required files
-            t2w_path = None
-            adc_path = None
-            
-            for t2w_pattern, adc_pattern in patterns:
-                t2w_candidates = list(patient_dir.glob(t2w_pattern))
-                adc_candidates = list(patient_dir.glob(adc_pattern))
-                
-                if t2w_candidates and adc_candidates:
-                    t2w_path = t2w_candidates[0]
-                    adc_path = adc_candidates[0]
-                    break
-            
-            # Also check for exact naming
-            if not t2w_path:
-                exact_t2w = patient_dir / f"{patient_id}_t2w.nii.gz"
-                exact_adc = patient_dir / f"{patient_id}_adc.nii.gz"
-                
-                if exact_t2w.exists() and exact_adc.exists():
-                    t2w_path = exact_t2w
-                    adc_path = exact_adc
-            
-            if t2w_path and adc_path:
-                patients.append({
-                    'patient_id': patient_id,
-                    't2w_path': str(t2w_path),
-                    'adc_path': str(adc_path),
-                    'patient_dir': str(patient_dir)
-                })
-                self.logger.info(f"Found patient {patient_id}")
-            else:
-                self.logger.warning(f"Skipping {patient_id}: missing required files")
+        patients = [patient for patient in found if patient]
         
         self.logger.info(f"Found {len(patients)} patients with complete data")
         
@@ -122,15 +108,52 @@ class PatientDiscoveryStep(PipelineStep):
             'patients': patients,
             'total_patients': len(patients)
         }
+    
+    def _check_patient(self, patient_dir: os.DirEntry) -> Optional[Dict[str, str]]:
+        """
+        Look for the T2W/ADC pair in a single patient directory
+        """
+        patient_id = patient_dir.name
+        
+        # Check for required files in a single directory listing,
+        # matching naming conventions by case-insensitive suffix
+        t2w_suffixes = self.T2W_SUFFIXES
+        adc_suffixes = self.ADC_SUFFIXES
+        t2w_path = None
+        adc_path = None
+        
+        with os.scandir(patient_dir.path) as entries:
+            for entry in entries:
+                name = entry.name.lower()
+                if t2w_path is None and name.endswith(t2w_suffixes):
+                    t2w_path = entry.path
+                elif adc_path is None and name.endswith(adc_suffixes):
+                    adc_path = entry.path
+                
+                if t2w_path and adc_path:
+                    break
+        
+        if not (t2w_path and adc_path):
+            self.logger.warning(f"Skipping {patient_id}: missing required files")
+            return None
+        
+        self.logger.info(f"Found patient {patient_id}")
+        return {
+            'patient_id': patient_id,
+            't2w_path': t2w_path,
+            'adc_path': adc_path,
+            'patient_dir': patient_dir.path
+        }
 
 class BatchStandardizationStep(PipelineStep):
     """
     Train standardization on all images before processing
     """
     
-    def __init__(self, method: str = 'nyul'):
+    def __init__(self, method: str = 'nyul', max_workers: Optional[int] = None):
         super().__init__("BatchStandardizationStep", "Train standardization on all images")
         self.method = method
+        self.max_workers = max_workers
     
     def execute(self, data: Dict[str, Any], **kwargs) -> Dict[str, Any]:
         """
@@ -139,32 +162,29 @@ class BatchStandardizationStep(PipelineStep):
         patients = data['patients']
         
         if self.method == 'nyul':
-            from ..preprocessing.standardization import NyulStandardizer
-            
             self.logger.info("Training Nyul standardization on all T2W images")
             
-            # Load all T2W images for training
-            t2w_images = []
-            for patient in patients[:20]:  # Use first 20 for training
-                try:
-                    img = sitk.ReadImage(patient['t2w_path'])
-                    t2w_images.append(img)
-                except Exception as e:
-                    self.logger.warning(f"Failed to load {patient['patient_id']}: {e}")
+            # Workers read the training volumes themselves and return only landmarks
+            training_paths = [patient['t2w_path'] for patient in patients[:20]]  # Use first 20 for training
             
             # Train standardizer
             t2w_standardizer = NyulStandardizer()
-            t2w_standardizer.train(t2w_images)
+            t2w_standardizer.train(
+                training_paths,
+                max_workers=min(self.max_workers or 1, len(training_paths))
+            )
             
-            # Save parameters
+            # Save parameters (worker processes reload them from this file)
             output_dir = Path(data['output_directory'])
+            output_dir.mkdir(parents=True, exist_ok=True)
             param_file = output_dir / 'nyul_parameters.json'
             t2w_standardizer.save_parameters(str(param_file))
             
             return {
                 't2w_standardizer': t2w_standardizer,
+                't2w_parameters_path': str(param_file),
                 'standardization_trained': True,
-                'training_samples': len(t2w_images)
+                'training_samples': t2w_standardizer.num_training_images
             }
         
         else:
@@ -176,17 +196,28 @@ class BatchProcessingStep(PipelineStep):
     Process all patients with optional parallel processing
     """
     
+    # Output images written per patient, grouped by the pipeline step producing them
+    OUTPUTS_BY_STEP = {
+        'StandardizationStep': ('t2w_standardized', 'adc_standardized'),
+        'SegmentationStep': ('prostate_segmentation',),
+        'RegistrationStep': ('registered_adc',),
+        'ROIExtractionStep': ('t2w_standardized_roi', 'adc_standardized_roi')
+    }
+    
     def __init__(self, 
                  registration_type: str = 'rigid',
                  enable_segmentation: bool = True,
                  parallel: bool = True,
-                 max_workers: int = 4):
+                 max_workers: int = 4,
+                 force_reprocess: bool = False):
         
         super().__init__("BatchProcessingStep", "Process all patients")
         self.registration_type = registration_type
         self.enable_segmentation = enable_segmentation
         self.parallel = parallel
         self.max_workers = max_workers
+        self.force_reprocess = force_reprocess
+        self._pipelines = {}
     
     def execute(self, data: Dict[str, Any], **kwargs) -> Dict[str, Any]:
         """
@@ -198,12 +229,13 @@ class BatchProcessingStep(PipelineStep):
         # Get standardizer if available
         t2w_standardizer = data.get('t2w_standardizer')
         
-        # Results tracking
-        results = {
-            'successful': [],
-            'failed': [],
-            'detailed_results': {}
+        # Results tracking: one column per field, indexed like `patients`
+        table = {
+            'patient_id': np.array([p['patient_id'] for p in patients], dtype=object),
+            'success': np.zeros(len(patients), dtype=bool),
+            'execution_time': np.full(len(patients), np.nan, dtype=np.float32)
         }
+        detailed_results = {}
         
         # Process function for single patient
         def process_patient(patient_info):
@@ -217,57 +249,166 @@ class BatchProcessingStep(PipelineStep):
         if self.parallel and len(patients) > 1:
             self.logger.info(f"Processing {len(patients)} patients in parallel (max {self.max_workers} workers)")
             
-            with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-                # Submit all tasks
-                future_to_patient = {
-                    executor.submit(process_patient, patient): patient 
-                    for patient in patients
+            # Workers receive only paths and settings; images and standardizer
+            # parameters are re-read from disk inside the worker
+            t2w_parameters_path = None
+            if t2w_standardizer is not None:
+                t2w_parameters_path = data.get('t2w_parameters_path')
+                if not isinstance(t2w_standardizer, NyulStandardizer) or not t2w_parameters_path:
+                    # Workers could only fall back to per-image z-score, which
+                    # would silently differ from sequential processing
+                    raise ValueError(
+                        "Parallel processing needs a trained NyulStandardizer with "
+                        "'t2w_parameters_path' so workers can reload it"
+                    )
+            
+            def make_task(patient):
+                return {
+                    'patient_info': patient,
+                    'output_directory': str(output_dir),
+                    't2w_parameters_path': t2w_parameters_path,
+                    'registration_type': self.registration_type,
+                    'enable_segmentation': self.enable_segmentation,
+                    'force_reprocess': self.force_reprocess
                 }
-                
-                # Process results with progress bar
-                with tqdm(total=len(patients), desc="Processing patients") as pbar:
-                    for future in concurrent.futures.as_completed(future_to_patient):
-                        patient = future_to_patient[future]
-                        try:
-                            result = future.result()
-                            if result['success']:
-                                results['successful'].append(patient['patient_id'])
-                            else:
-                                results['failed'].append(patient['patient_id'])
-                            results['detailed_results'][patient['patient_id']] = result
-                        except Exception as e:
-                            self.logger.error(f"Failed to process {patient['patient_id']}: {e}")
-                            results['failed'].append(patient['patient_id'])
-                            results['detailed_results'][patient['patient_id']] = {
-                                'success': False,
-                                'error': str(e)
-                            }
-                        pbar.update(1)
+            
+            # Keep a bounded window of futures in flight and handle them as they complete
+            max_in_flight = self.max_workers * 2
+            pending = iter(enumerate(patients))
+            
+            # Spawned (not forked) workers start without inherited ITK thread state
+            mp_context = multiprocessing.get_context("spawn")
+            
+            # Spawned workers have no logging setup of their own; their records
+            # are queued back and handled by this process's loggers
+            log_queue = mp_context.Queue()
+            log_listener = logging.handlers.QueueListener(log_queue, _LogRecordForwarder())
+            log_listener.start()
+            
+            try:
+                with concurrent.futures.ProcessPoolExecutor(
+                        max_workers=self.max_workers,
+                        mp_context=mp_context,
+                        initializer=_init_worker_logging,
+                        initargs=(log_queue, logging.getLogger().getEffectiveLevel())
+                ) as executor, tqdm(total=len(patients), desc="Processing patients") as pbar:
+                    
+                    in_flight = {}
+                    
+                    def submit_next():
+                        item = next(pending, None)
+                        if item is not None:
+                            i, patient = item
+                            in_flight[executor.submit(_process_one_patient, make_task(patient))] = i
+                    
+                    for _ in range(max_in_flight):
+                        submit_next()
+                    
+                    while in_flight:
+                        done, _ = concurrent.futures.wait(
+                            in_flight, return_when=concurrent.futures.FIRST_COMPLETED
+                        )
+                        for future in done:
+                            try:
+                                result = future.result()
+                            except Exception as e:
+                                result = {
+                                    'success': False,
+                                    'error': str(e)
+                                }
+                            self._record_result(table, detailed_results, in_flight.pop(future), result)
+                            pbar.update(1)
+                            submit_next()
+            finally:
+                log_listener.stop()
         else:
             # Sequential processing
             self.logger.info(f"Processing {len(patients)} patients sequentially")
             
-            for patient in tqdm(patients, desc="Processing patients"):
+            for i, patient in enumerate(tqdm(patients, desc="Processing patients")):
                 try:
                     result = process_patient(patient)
-                    if result['success']:
-                        results['successful'].append(patient['patient_id'])
-                    else:
-                        results['failed'].append(patient['patient_id'])
-                    results['detailed_results'][patient['patient_id']] = result
                 except Exception as e:
-                    self.logger.error(f"Failed to process {patient['patient_id']}: {e}")
-                    results['failed'].append(patient['patient_id'])
-                    results['detailed_results'][patient['patient_id']] = {
+                    result = {
                         'success': False,
                         'error': str(e)
                     }
+                self._record_result(table, detailed_results, i, result)
         
         # Summary
-        success_rate = len(results['successful']) / len(patients) if patients else 0
+        success = table['success']
+        success_rate = float(success.mean()) if patients else 0
         self.logger.info(f"Batch processing complete: {success_rate:.1%} success rate")
         
-        return results
+        return {
+            'successful': table['patient_id'][success].tolist(),
+            'failed': table['patient_id'][~success].tolist(),
+            'detailed_results': detailed_results,
+            'results_table': pd.DataFrame(table)
+        }
+    
+    def _record_result(self,
+                       table: Dict[str, np.ndarray],
+                       detailed_results: Dict[str, Any],
+                       index: int,
+                       result: Dict[str, Any]) -> None:
+        """Store a single patient result at its row in the results table"""
+        patient_id = table['patient_id'][index]
+        if result['success']:
+            table['success'][index] = True
+            table['execution_time'][index] = result['execution_time']
+        else:
+            self.logger.error(f"Failed to process {patient_id}: {result.get('error')}")
+        detailed_results[patient_id] = result
+    
+    def _get_pipeline(self, t2w_standardizer: Optional[Any] = None) -> PreprocessingPipeline:
+        """
+        Get the preprocessing pipeline, reused across patients
+        
+        Steps (including the segmentation model) are built once per
+        standardization method; only the T2W standardizer is swapped per patient.
+        """
+        method = 'nyul' if t2w_standardizer else 'zscore'
+        pipeline = self._pipelines.get(method)
+        if pipeline is None:
+            pipeline = PreprocessingPipeline(
+                registration_type=self.registration_type,
+                standardization_method=method,
+                enable_segmentation=self.enable_segmentation
+            )
+            self._pipelines[method] = pipeline
+        
+        # Inject trained standardizer if available, otherwise start from an
+        # untrained z-score standardizer so no statistics leak between patients
+        pipeline.steps[0].standardizer = t2w_standardizer if t2w_standardizer else ZScoreStandardizer()
+        
+        return pipeline
+    
+    def _expected_outputs(self) -> List[str]:
+        """Names of the output images a complete run writes for one patient"""
+        skipped_steps = () if self.enable_segmentation else ('SegmentationStep', 'ROIExtractionStep')
+        return [
+            name
+            for step_name, names in self.OUTPUTS_BY_STEP.items() if step_name not in skipped_steps
+            for name in names
+        ]
+    
+    def _outputs_up_to_date(self,
+                            patient_info: Dict[str, Any],
+                            patient_output_dir: str,
+                            expected_outputs: List[str]) -> bool:
+        """Check that every expected output exists and is newer than both inputs"""
+        try:
+            inputs_mtime = max(
+                os.stat(patient_info['t2w_path']).st_mtime,
+                os.stat(patient_info['adc_path']).st_mtime
+            )
+            return all(
+                os.stat(f"{patient_output_dir}/{name}.nii.gz").st_mtime >= inputs_mtime
+                for name in expected_outputs
+            )
+        except OSError:
+            return False
     
     def _process_single_patient(self, 
                                patient_info: Dict[str, Any],
@@ -277,24 +418,30 @@ class BatchProcessingStep(PipelineStep):
         Process a single patient
         """
         patient_id = patient_info['patient_id']
-        patient_output_dir = output_dir / patient_id
-        patient_output_dir.mkdir(parents=True, exist_ok=True)
+        # Plain string prefix; output paths below are built by formatting
+        patient_output_dir = os.path.join(str(output_dir), patient_id)
+        os.makedirs(patient_output_dir, exist_ok=True)
+        
+        # Skip patients whose outputs from a previous run are all newer than the inputs
+        if not self.force_reprocess:
+            expected_outputs = self._expected_outputs()
+            if self._outputs_up_to_date(patient_info, patient_output_dir, expected_outputs):
+                self.logger.info(f"Skipping {patient_id}: outputs up to date")
+                return {
+                    'success': True,
+                    'patient_id': patient_id,
+                    'outputs_saved': expected_outputs,
+                    'output_directory': patient_output_dir,
+                    'execution_time': 0.0,
+                    'skipped': True
+                }
         
         try:
             # Load images
             t2w_image = sitk.ReadImage(patient_info['t2w_path'])
             adc_image = sitk.ReadImage(patient_info['adc_path'])
             
-            # Create preprocessing pipeline
-            pipeline = PreprocessingPipeline(
-                registration_type=self.registration_type,
-                standardization_method='nyul' if t2w_standardizer else 'zscore',
-                enable_segmentation=self.enable_segmentation
-            )
-            
-            # Inject trained standardizer if available
-            if t2w_standardizer:
-                pipeline.steps[0].standardizer = t2w_standardizer
+            pipeline = self._get_pipeline(t2w_standardizer)
             
             # Run pipeline
             input_data = {
@@ -302,41 +449,33 @@ class BatchProcessingStep(PipelineStep):
                 'adc_image': adc_image
             }
             
-            pipeline_results = pipeline.execute(input_data)
+            pipeline_results = pipeline.execute(input_data, trust_inputs=True)
             
             # Save results
             outputs_saved = []
             
-            # Define what to save
-            outputs_to_save = [
-                ('t2w_standardized', 'StandardizationStep'),
-                ('adc_standardized', 'StandardizationStep'),
-                ('prostate_segmentation', 'SegmentationStep'),
-                ('registered_adc', 'RegistrationStep'),
-                ('t2w_standardized_roi', 'ROIExtractionStep'),
-                ('adc_standardized_roi', 'ROIExtractionStep')
-            ]
+            step_results = pipeline_results['step_results']
             
-            for output_name, step_name in outputs_to_save:
-                if step_name in pipeline_results['step_results']:
-                    step_result = pipeline_results['step_results'][step_name].get('result', {})
+            for step_name, output_names in self.OUTPUTS_BY_STEP.items():
+                step_result = step_results.get(step_name, {}).get('result') or {}
+                for output_name in output_names:
                     if output_name in step_result:
-                        output_path = patient_output_dir / f"{output_name}.nii.gz"
-                        sitk.WriteImage(step_result[output_name], str(output_path))
+                        output_path = f"{patient_output_dir}/{output_name}.nii.gz"
+                        sitk.WriteImage(step_result[output_name], output_path)
                         outputs_saved.append(output_name)
             
             # Save transform if available
-            if 'RegistrationStep' in pipeline_results['step_results']:
-                transform = pipeline_results['step_results']['RegistrationStep']['result'].get('registration_transform')
+            if 'RegistrationStep' in step_results:
+                transform = step_results['RegistrationStep']['result'].get('registration_transform')
                 if transform:
-                    transform_path = patient_output_dir / 'registration_transform.tfm'
-                    sitk.WriteTransform(transform, str(transform_path))
+                    transform_path = f"{patient_output_dir}/registration_transform.tfm"
+                    sitk.WriteTransform(transform, transform_path)
             
             return {
                 'success': True,
                 'patient_id': patient_id,
                 'outputs_saved': outputs_saved,
-                'output_directory': str(patient_output_dir),
+                'output_directory': patient_output_dir,
                 'execution_time': pipeline_results['metadata']['total_execution_time']
             }
             
@@ -348,6 +487,62 @@ class BatchProcessingStep(PipelineStep):
                 'error_type': type(e).__name__
             }
 
+class _LogRecordForwarder(logging.Handler):
+    """Hand log records from worker processes to the logger they were emitted on"""
+    
+    def emit(self, record: logging.LogRecord) -> None:
+        logging.getLogger(record.name).handle(record)
+
+def _init_worker_logging(log_queue, level: int) -> None:
+    """Worker initializer: send every log record back to the parent process"""
+    root = logging.getLogger()
+    root.handlers[:] = [logging.handlers.QueueHandler(log_queue)]
+    root.setLevel(level)
+
+# Per-worker-process cache of (processing step, trained standardizer), keyed
+# by task settings, so pipelines and parameters are built once per worker
+_WORKER_CACHE: Dict[Tuple[str, bool, bool, Optional[str]], Tuple['BatchProcessingStep', Optional[NyulStandardizer]]] = {}
+
+def _process_one_patient(task: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Process a single patient inside a worker process
+    
+    Module-level so it can be pickled by ProcessPoolExecutor. The task dict
+    carries only paths and settings; images and the trained Nyul parameters
+    are read inside the worker.
+    """
+    patient_id = task['patient_info']['patient_id']
+    try:
+        key = (task['registration_type'], task['enable_segmentation'],
+               task['force_reprocess'], task['t2w_parameters_path'])
+        if key not in _WORKER_CACHE:
+            t2w_standardizer = None
+            if task['t2w_parameters_path']:
+                t2w_standardizer = NyulStandardizer()
+                t2w_standardizer.load_parameters(task['t2w_parameters_path'])
+            
+            step = BatchProcessingStep(
+                registration_type=task['registration_type'],
+                enable_segmentation=task['enable_segmentation'],
+                parallel=False,
+                force_reprocess=task['force_reprocess']
+            )
+            _WORKER_CACHE[key] = (step, t2w_standardizer)
+        
+        step, t2w_standardizer = _WORKER_CACHE[key]
+        return step._process_single_patient(
+            task['patient_info'],
+            Path(task['output_directory']),
+            t2w_standardizer
+        )
+    except Exception as e:
+        return {
+            'success': False,
+            'patient_id': patient_id,
+            'error': str(e),
+            'error_type': type(e).__name__
+        }
+
 class BatchReportingStep(PipelineStep):
     """
     Generate comprehensive batch processing report
@@ -361,7 +556,13 @@ class BatchReportingStep(PipelineStep):
         Generate reports
         """
         output_dir = Path(data['output_directory'])
-        batch_results = data.get('BatchProcessingStep', {})
+        # BatchProcessingStep results are merged into the pipeline data
+        batch_results = data
+        table = data.get('results_table', pd.DataFrame({
+            'patient_id': [], 'success': np.zeros(0, dtype=bool), 'execution_time': []
+        }))
+        n_successful = int(table['success'].sum())
+        time_stats = table.loc[table['success'], 'execution_time'].describe()
         
         # Create reports directory
         reports_dir = output_dir / 'reports'
@@ -372,9 +573,14 @@ class BatchReportingStep(PipelineStep):
             'pipeline_name': 'BatchPreprocessingPipeline',
             'timestamp': datetime.now().isoformat(),
             'total_patients': data['total_patients'],
-            'successful': len(batch_results.get('successful', [])),
-            'failed': len(batch_results.get('failed', [])),
-            'success_rate': len(batch_results.get('successful', [])) / data['total_patients'] if data['total_patients'] > 0 else 0,
+            'successful': n_successful,
+            'failed': len(table) - n_successful,
+            'success_rate': n_successful / data['total_patients'] if data['total_patients'] > 0 else 0,
+            # std is NaN for a single patient; write null so both JSON backends agree
+            'execution_time_stats': {
+                stat: float(value) if np.isfinite(value) else None
+                for stat, value in time_stats.items()
+            } if n_successful else {},
             'configuration': {
                 'registration_type': data.get('registration_type', 'unknown'),
                 'standardization_method': data.get('standardization_method', 'unknown'),
@@ -384,38 +590,47 @@ class BatchReportingStep(PipelineStep):
         
         # Save JSON summary
         summary_path = reports_dir / 'batch_summary.json'
-        with open(summary_path, 'w') as f:
-            json.dump(summary, f, indent=2)
+        if orjson is not None:
+            with open(summary_path, 'wb') as f:
+                f.write(orjson.dumps(summary, option=orjson.OPT_INDENT_2))
+        else:
+            with open(summary_path, 'w') as f:
+                json.dump(summary, f, indent=2)
         
         # Generate CSV report
         csv_path = reports_dir / 'batch_results.csv'
-        with open(csv_path, 'w', newline='') as f:
+        # Build CSV rows and error log entries in a single pass over the results
+        rows = []
+        error_entries = []
+        for patient_id, result in batch_results.get('detailed_results', {}).items():
+            rows.append([
+                patient_id,
+                'Success' if result.get('success') else 'Failed',
+                result.get('execution_time', 'N/A'),
+                ','.join(result.get('outputs_saved', [])),
+                result.get('error', '')
+            ])
+            if not result.get('success'):
+                error_entries.append(
+                    f"Patient: {patient_id}\n"
+                    f"Error: {result.get('error', 'Unknown error')}\n"
+                    f"Error Type: {result.get('error_type', 'Unknown')}\n"
+                    + "-" * 40 + "\n\n"
+                )
+        
+        with open(csv_path, 'w', newline='', buffering=1 << 20) as f:
             writer = csv.writer(f)
             writer.writerow(['PatientID', 'Status', 'ExecutionTime', 'OutputsSaved', 'Error'])
-            
-            for patient_id, result in batch_results.get('detailed_results', {}).items():
-                writer.writerow([
-                    patient_id,
-                    'Success' if result.get('success') else 'Failed',
-                    result.get('execution_time', 'N/A'),
-                    ','.join(result.get('outputs_saved', [])),
-                    result.get('error', '')
-                ])
+            writer.writerows(rows)
         
         # Generate error log
-        if batch_results.get('failed'):
+        if error_entries:
             error_log_path = reports_dir / 'error_log.txt'
             with open(error_log_path, 'w') as f:
                 f.write(f"Batch Processing Error Log\n")
                 f.write(f"Generated: {datetime.now()}\n")
                 f.write("=" * 60 + "\n\n")
-                
-                for patient_id in batch_results.get('failed', []):
-                    result = batch_results.get('detailed_results', {}).get(patient_id, {})
-                    f.write(f"Patient: {patient_id}\n")
-                    f.write(f"Error: {result.get('error', 'Unknown error')}\n")
-                    f.write(f"Error Type: {result.get('error_type', 'Unknown')}\n")
-                    f.write("-" * 40 + "\n\n")
+                f.writelines(error_entries)
         
         self.logger.info(f"Reports saved to {reports_dir}")
         
@@ -50,6 +50,10 @@ class StandardizationStep(PipelineStep):
             self.standardizer = ZScoreStandardizer()
         else:
             raise ValueError(f"Unknown standardization method: {method}")
+        
+        # ADC uses per-image z-score standardization (never trained), so one
+        # instance can be reused for every image
+        self.adc_standardizer = ZScoreStandardizer()
     
     def execute(self, data: Dict[str, Any], **kwargs) -> Dict[str, Any]:
         """Apply intensity standardization"""
@@ -70,9 +74,7 @@ class StandardizationStep(PipelineStep):
         # Standardize ADC
         if adc_image is not None:
             self.logger.info("Standardizing ADC image")
-            # ADC uses different standardization
-            adc_standardizer = ZScoreStandardizer()
-            results['adc_standardized'] = adc_standardizer.transform(adc_image)
+            results['adc_standardized'] = self.adc_standardizer.transform(adc_image)
         
         return results
 
@@ -115,15 +117,19 @@ class ROIExtractionStep(PipelineStep):
         
         results = {}
         
+        # The segmentation bounding box is computed once and reused for every image;
+        # only the clipping to each image's extent differs
+        bbox = self.extractor.compute_bounding_box(segmentation)
+        
         # Extract ROI from all available images
         for key in ['t2w_standardized', 'adc_standardized', 't2w_image', 'adc_image']:
             if key in data and data[key] is not None:
-                roi_img, roi_mask = self.extractor.extract_bounding_box(
-                    data[key], segmentation, self.padding
-                )
-                results[f'{key}_roi'] = roi_img
+                start, size = self.extractor.padded_region(bbox, data[key].GetSize(), self.padding)
+                results[f'{key}_roi'] = sitk.RegionOfInterest(data[key], size, start)
         
-        results['roi_mask'] = roi_mask
+        # Mask cropped to the region of the last extracted image
+        results['roi_mask'] = sitk.RegionOfInterest(segmentation, size, start)
+        self.logger.info(f"Extracted ROI: size={size}, start={start}")
         
         return results
 
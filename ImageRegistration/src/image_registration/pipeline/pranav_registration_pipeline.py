@@ -2,44 +2,132 @@
 Professional wrapper around Pranav's ADC-T2W registration code
 """
 import os
-import subprocess
-import shutil
-import csv
-import platform
+import time
+import collections
+import importlib.util
+import functools
 from pathlib import Path
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Dict, List, Optional, Any, Tuple, Iterable, Iterator, Union
 import logging
 from datetime import datetime
 import json
 
 from .base_pipeline import BasePipeline, PipelineStep
 
+@functools.lru_cache(maxsize=None)
+def _simple_elastix_available() -> bool:
+    """
+    Whether SimpleITK is installed with SimpleElastix
+    
+    Checked on first use rather than at import, so importing this module does
+    not load SimpleITK; only SimpleElastix builds ship the elastix filter.
+    """
+    try:
+        import SimpleITK as sitk
+    except ImportError:
+        return False
+    return hasattr(sitk, 'ElastixImageFilter')
+
+# ITKElastix (itk-elastix wheels) also runs elastix in-process; itk is only
+# imported by the engine when used, as loading its modules takes seconds
+ITK_AVAILABLE = importlib.util.find_spec('itk') is not None
+
 class PranavRegistrationEngine:
     """
     Enhanced version of Pranav's registration approach with professional infrastructure
     """
     
+    # elastix only estimates the transform; transformix does the single final resample
+    ELASTIX_PARAMETER_OVERRIDES = {
+        'WriteResultImage': 'false',
+        'WriteResultImageAfterEachResolution': 'false',
+        'ResultImageFormat': 'nii.gz'
+    }
+    
     def __init__(self, 
                  elastix_installation_path: Optional[str] = None,
-                 rigid_params_path: Optional[str] = None):
+                 rigid_params_path: Optional[str] = None,
+                 number_of_threads: Optional[int] = None,
+                 registration_downsample_factor: int = 1):
         """
         Initialize Pranav's registration engine
+        
+        If SimpleITK was built with SimpleElastix, or ITKElastix is installed,
+        registration runs in-process and no elastix installation is needed;
+        otherwise the elastix and transformix executables are called per patient.
+        
+        Args:
+            number_of_threads: Cap on elastix/ITK threads per registration
+                (None lets elastix use all cores)
+            registration_downsample_factor: Estimate the transform on images
+                coarsened by this factor per axis; the registered ADC is still
+                resampled from the native ADC onto the native T2W grid
         """
         
-        # Auto-detect platform and set paths
+        # Initialize logging
+        self.logger = logging.getLogger(__name__)
+        
+        import platform
+        
         self.platform = platform.system().lower()
+        self.use_simple_elastix = _simple_elastix_available()
+        self.use_itk_elastix = False
+        self.number_of_threads = number_of_threads
+        self.registration_downsample_factor = registration_downsample_factor
+        
+        if registration_downsample_factor > 1 and importlib.util.find_spec('SimpleITK') is None:
+            raise ImportError("SimpleITK is required for registration_downsample_factor > 1")
+        
+        if self.use_simple_elastix:
+            import SimpleITK as sitk
+            
+            self.rigid_params_path = rigid_params_path or self._find_rigid_params()
+            
+            # Parse the parameter file once and reuse one filter for all patients
+            self._parameter_map = sitk.ReadParameterFile(self.rigid_params_path)
+            self._elastix_filter = sitk.ElastixImageFilter()
+            self._elastix_filter.LogToConsoleOff()
+            if number_of_threads:
+                self._elastix_filter.SetNumberOfThreads(number_of_threads)
+            self.logger.info("Using in-process SimpleElastix registration")
+            return
+        
+        if ITK_AVAILABLE and self._setup_itk_elastix(rigid_params_path):
+            self.logger.info("Using in-process ITKElastix registration")
+            return
+        
+        # Auto-detect platform and set paths
         self.elastix_path, self.transformix_path = self._setup_elastix_paths(elastix_installation_path)
         self.rigid_params_path = rigid_params_path or self._find_rigid_params()
+        self._elastix_params_text = self._override_parameters(
+            Path(self.rigid_params_path).read_text(), self.ELASTIX_PARAMETER_OVERRIDES
+        )
         
         # Setup environment
         self.env = self._setup_environment()
         
-        # Initialize logging
-        self.logger = logging.getLogger(__name__)
-        
         # Verify installation
         self._verify_elastix_installation()
     
+    def _setup_itk_elastix(self, rigid_params_path: Optional[str]) -> bool:
+        """Load the rigid parameters into an ITKElastix parameter object, if ITKElastix is installed"""
+        import itk
+        
+        try:
+            parameter_object = itk.ParameterObject.New()
+        except AttributeError:
+            # Plain ITK without the elastix module
+            return False
+        
+        self.rigid_params_path = rigid_params_path or self._find_rigid_params()
+        
+        # Parse the parameter file once and reuse it for all patients
+        parameter_object.AddParameterFile(self.rigid_params_path)
+        self._itk = itk
+        self._parameter_object = parameter_object
+        self.use_itk_elastix = True
+        return True
+    
     def _setup_elastix_paths(self, installation_path: Optional[str]) -> Tuple[str, str]:
         """Setup elastix and transformix executable paths based on platform"""
         
@@ -97,6 +185,10 @@ class PranavRegistrationEngine:
             lib_path = f"{elastix_base}/lib"
             env["LD_LIBRARY_PATH"] = f"{lib_path}:{env.get('LD_LIBRARY_PATH', '')}"
         
+        # Limit elastix/transformix threading when several run side by side
+        if self.number_of_threads:
+            env["ITK_GLOBAL_DEFAULT_NUMBER_OF_THREADS"] = str(self.number_of_threads)
+        
         return env
     
     def _find_rigid_params(self) -> str:
@@ -114,8 +206,88 @@ class PranavRegistrationEngine:
         
         raise FileNotFoundError("Could not find rigid.txt parameter file")
     
+    @staticmethod
+    def _override_parameters(text: str, overrides: Dict[str, Any]) -> str:
+        """
+        Set (Name "value") entries in elastix parameter file text, appending missing ones
+        
+        List values are written unquoted, as for numeric entries like (Size 10 10 10).
+        """
+        def entry(name, value):
+            if isinstance(value, (list, tuple)):
+                return f'({name} {" ".join(value)})'
+            return f'({name} "{value}")'
+        
+        lines = text.splitlines()
+        missing = dict(overrides)
+        
+        for i, line in enumerate(lines):
+            stripped = line.strip()
+            if stripped.startswith('('):
+                name = stripped[1:].split(None, 1)[0].rstrip(')')
+                if name in overrides:
+                    lines[i] = entry(name, overrides[name])
+                    missing.pop(name, None)
+        
+        lines.extend(entry(name, value) for name, value in missing.items())
+        return '\n'.join(lines) + '\n'
+    
+    def _downsample(self, image: 'sitk.Image') -> 'sitk.Image':
+        """Resample an image onto a grid coarser by the downsample factor (same origin and direction)"""
+        import SimpleITK as sitk
+        
+        factor = self.registration_downsample_factor
+        return sitk.Resample(
+            image,
+            [max(1, -(-n // factor)) for n in image.GetSize()],
+            sitk.Transform(),
+            sitk.sitkLinear,
+            image.GetOrigin(),
+            [s * factor for s in image.GetSpacing()],
+            image.GetDirection(),
+            0.0,
+            image.GetPixelID()
+        )
+    
+    @staticmethod
+    def _native_grid_parameters(t2w_path: Path) -> Dict[str, List[str]]:
+        """
+        Transform parameter entries that resample onto the full-resolution T2W grid
+        
+        Downsampling keeps origin and direction, so only size and spacing differ;
+        the rigid transform itself is in physical units and needs no rescaling.
+        """
+        import SimpleITK as sitk
+        
+        reader = sitk.ImageFileReader()
+        reader.SetFileName(str(t2w_path))
+        reader.ReadImageInformation()
+        return {
+            'Size': [str(n) for n in reader.GetSize()],
+            'Spacing': [repr(float(s)) for s in reader.GetSpacing()]
+        }
+    
     def _verify_elastix_installation(self):
-        """Verify that elastix is properly installed"""
+        """
+        Verify that elastix is properly installed
+        
+        A successful check leaves a marker keyed on the binary's path and
+        mtime, so later engines (e.g. one per worker) skip running elastix.
+        """
+        try:
+            stat_key = f"{self.elastix_path}:{os.stat(self.elastix_path).st_mtime_ns}"
+        except OSError:
+            raise RuntimeError(f"elastix not found or not executable at {self.elastix_path}")
+        
+        import hashlib
+        
+        key = hashlib.blake2b(stat_key.encode()).hexdigest()[:16]
+        marker_path = Path.home() / '.cache' / 'tempra' / f'elastix_verified_{key}'
+        if marker_path.exists():
+            return
+        
+        import subprocess
+        
         try:
             result = subprocess.run([self.elastix_path, '--help'], 
                                   capture_output=True, text=True, timeout=10, env=self.env)
@@ -123,57 +295,84 @@ class PranavRegistrationEngine:
                 raise RuntimeError("elastix not working properly")
         except (subprocess.TimeoutExpired, FileNotFoundError, PermissionError):
             raise RuntimeError(f"elastix not found or not executable at {self.elastix_path}")
+        
+        try:
+            marker_path.parent.mkdir(parents=True, exist_ok=True)
+            marker_path.touch()
+        except OSError as e:
+            self.logger.debug(f"Could not cache elastix verification: {e}")
     
     def register_adc_to_t2w(self,
                            patient_id: str,
-                           adc_path: str,
-                           t2w_path: str,
-                           output_dir: str) -> Dict[str, Any]:
+                           adc_path: Union[str, Path],
+                           t2w_path: Union[str, Path],
+                           output_dir: Union[str, Path],
+                           force: bool = False) -> Dict[str, Any]:
         """
         Register ADC to T2W using Pranav's approach
+        
+        Outputs, including the registered ADC ({patient_id}_adc_reg.nii.gz),
+        are written to output_dir/patient_id; the input folder is not modified.
+        Unless force is set, a patient whose transform and registered ADC are
+        newer than both inputs is not registered again.
         """
+        adc_path, t2w_path = Path(adc_path), Path(t2w_path)
         
         # Create patient-specific output directory
         patient_output_dir = Path(output_dir) / patient_id
         patient_output_dir.mkdir(parents=True, exist_ok=True)
         
-        # Define output paths
+        # Define output paths; nothing is written into the input tree
         transform_params_path = patient_output_dir / 'TransformParameters.0.txt'
-        registered_adc_path = Path(adc_path).parent / f"{patient_id}_adc_reg.nii.gz"
+        registered_adc_path = patient_output_dir / f"{patient_id}_adc_reg.nii.gz"
+        
+        # Skip patients completed by a previous run
+        if not force and self._is_up_to_date(transform_params_path, adc_path, t2w_path) \
+                and self._is_up_to_date(registered_adc_path, adc_path, t2w_path):
+            self.logger.info(f"Skipping {patient_id}: registration outputs up to date")
+            return {
+                'patient_id': patient_id,
+                'success': True,
+                'registered_adc_path': str(registered_adc_path),
+                'transform_parameters_path': str(transform_params_path),
+                'output_directory': str(patient_output_dir),
+                'skipped': True
+            }
         
         self.logger.info(f"Starting ADC-T2W registration for patient {patient_id}")
         
-        try:
-            # Step 1: Run elastix registration
-            elastix_cmd = [
-                self.elastix_path,
-                '-f', t2w_path,        # T2W is fixed (reference)
-                '-m', adc_path,        # ADC is moving (gets aligned)
-                '-p', self.rigid_params_path,
-                '-out', str(patient_output_dir)
-            ]
-            
-            self.logger.debug(f"Elastix command: {' '.join(elastix_cmd)}")
-            
-            elastix_result = subprocess.run(
-                elastix_cmd, 
-                env=self.env, 
-                capture_output=True, 
-                text=True,
-                timeout=1800  # 30 minute timeout
+        if self.use_simple_elastix:
+            return self._register_in_process(
+                patient_id, adc_path, t2w_path,
+                patient_output_dir, transform_params_path, registered_adc_path
             )
-            
-            if elastix_result.returncode != 0:
-                raise subprocess.CalledProcessError(
-                    elastix_result.returncode, elastix_cmd, elastix_result.stderr
+        
+        if self.use_itk_elastix:
+            return self._register_with_itk_elastix(
+                patient_id, adc_path, t2w_path,
+                patient_output_dir, transform_params_path, registered_adc_path
+            )
+        
+        # Only the elastix CLI path needs this; imported here to keep module import light
+        import subprocess
+        
+        try:
+            # Step 1: Run elastix registration, unless the transform from a
+            # previous run is still newer than both inputs
+            if not force and self._is_up_to_date(transform_params_path, adc_path, t2w_path):
+                self.logger.info(f"Reusing existing transform for patient {patient_id}")
+                elastix_log_path = None
+            else:
+                elastix_log_path = self._run_elastix(
+                    adc_path, t2w_path, patient_output_dir, transform_params_path
                 )
             
             # Step 2: Apply transformation to ADC
             transformix_cmd = [
                 self.transformix_path,
-                '-in', adc_path,
-                '-out', str(Path(adc_path).parent),
-                '-tp', str(transform_params_path)
+                '-in', os.fspath(adc_path),
+                '-out', os.fspath(patient_output_dir),
+                '-tp', os.fspath(transform_params_path)
             ]
             
             self.logger.debug(f"Transformix command: {' '.join(transformix_cmd)}")
@@ -191,18 +390,13 @@ class PranavRegistrationEngine:
                     transformix_result.returncode, transformix_cmd, transformix_result.stderr
                 )
             
-            # Step 3: Handle output files (following Pranav's approach)
-            result_temp_path = Path(adc_path).parent / "result.nii.gz"
+            # Step 3: Handle output files (following Pranav's approach); transformix
+            # wrote into the patient's own output directory, next to its log
+            result_temp_path = patient_output_dir / "result.nii.gz"
             
             if result_temp_path.exists():
-                # Move and rename result file
-                shutil.move(str(result_temp_path), str(registered_adc_path))
-                
-                # Move log files
-                transformix_log_src = Path(adc_path).parent / "transformix.log"
-                if transformix_log_src.exists():
-                    transformix_log_dst = patient_output_dir / "transformix.log"
-                    shutil.move(str(transformix_log_src), str(transformix_log_dst))
+                # Rename the result within the patient's output directory
+                os.replace(result_temp_path, registered_adc_path)
             else:
                 raise FileNotFoundError(f"Registration result file not found for {patient_id}")
             
@@ -213,7 +407,7 @@ class PranavRegistrationEngine:
                 'registered_adc_path': str(registered_adc_path),
                 'transform_parameters_path': str(transform_params_path),
                 'output_directory': str(patient_output_dir),
-                'elastix_log': elastix_result.stdout,
+                'elastix_log_path': elastix_log_path,
                 'transformix_log': transformix_result.stdout
             }
             
@@ -240,6 +434,214 @@ class PranavRegistrationEngine:
                 'error_type': 'unexpected_error'
             }
 
+    def _run_elastix(self,
+                     adc_path: Path,
+                     t2w_path: Path,
+                     patient_output_dir: Path,
+                     transform_params_path: Path) -> str:
+        """
+        Estimate the ADC-T2W transform with elastix (without writing a result image)
+        
+        Returns:
+            Path of the file holding elastix standard output
+        """
+        import subprocess
+        
+        elastix_params_path = patient_output_dir / 'rigid_elastix.txt'
+        elastix_params_path.write_text(self._elastix_params_text)
+        
+        # The transform file inherits WriteResultImage from the parameters;
+        # re-enable it so transformix (here and later) writes its result
+        transform_overrides = {'WriteResultImage': 'true'}
+        
+        if self.registration_downsample_factor > 1:
+            # Register coarsened copies; transformix still resamples the native ADC
+            import SimpleITK as sitk
+            
+            fixed_path = patient_output_dir / 't2w_downsampled.nii.gz'
+            moving_path = patient_output_dir / 'adc_downsampled.nii.gz'
+            sitk.WriteImage(self._downsample(sitk.ReadImage(str(t2w_path))), str(fixed_path))
+            sitk.WriteImage(self._downsample(sitk.ReadImage(str(adc_path))), str(moving_path))
+            transform_overrides.update(self._native_grid_parameters(t2w_path))
+        else:
+            fixed_path, moving_path = t2w_path, adc_path
+        
+        elastix_cmd = [
+            self.elastix_path,
+            '-f', os.fspath(fixed_path),     # T2W is fixed (reference)
+            '-m', os.fspath(moving_path),    # ADC is moving (gets aligned)
+            '-p', os.fspath(elastix_params_path),
+            '-out', os.fspath(patient_output_dir)
+        ]
+        
+        self.logger.debug(f"Elastix command: {' '.join(elastix_cmd)}")
+        
+        # elastix logs every iteration; send stdout straight to disk
+        elastix_log_path = patient_output_dir / 'elastix.stdout.log'
+        try:
+            with open(elastix_log_path, 'wb') as elastix_log:
+                elastix_result = subprocess.run(
+                    elastix_cmd, 
+                    env=self.env, 
+                    stdout=elastix_log,
+                    stderr=subprocess.PIPE,
+                    timeout=1800  # 30 minute timeout
+                )
+        finally:
+            if fixed_path != t2w_path:
+                fixed_path.unlink()
+                moving_path.unlink()
+        
+        if elastix_result.returncode != 0:
+            raise subprocess.CalledProcessError(
+                elastix_result.returncode, elastix_cmd,
+                stderr=elastix_result.stderr.decode(errors='replace')
+            )
+        
+        transform_params_path.write_text(self._override_parameters(
+            transform_params_path.read_text(), transform_overrides
+        ))
+        
+        return str(elastix_log_path)
+    
+    @staticmethod
+    def _is_up_to_date(output_path: Path, *input_paths: Path) -> bool:
+        """Check that output_path exists and is at least as new as every input"""
+        try:
+            output_mtime = output_path.stat().st_mtime
+            return all(output_mtime >= os.stat(path).st_mtime for path in input_paths)
+        except OSError:
+            return False
+    
+    def _register_in_process(self,
+                             patient_id: str,
+                             adc_path: Path,
+                             t2w_path: Path,
+                             patient_output_dir: Path,
+                             transform_params_path: Path,
+                             registered_adc_path: Path) -> Dict[str, Any]:
+        """
+        Register ADC to T2W with SimpleElastix, producing the same files as the CLI path
+        """
+        import SimpleITK as sitk
+        
+        try:
+            fixed_image = sitk.ReadImage(str(t2w_path))     # T2W is fixed (reference)
+            moving_image = sitk.ReadImage(str(adc_path))    # ADC is moving (gets aligned)
+            downsample = self.registration_downsample_factor > 1
+            
+            elastix = self._elastix_filter
+            elastix.SetFixedImage(self._downsample(fixed_image) if downsample else fixed_image)
+            elastix.SetMovingImage(self._downsample(moving_image) if downsample else moving_image)
+            elastix.SetParameterMap(self._parameter_map)
+            elastix.SetOutputDirectory(str(patient_output_dir))
+            elastix.Execute()
+            
+            transform_map = elastix.GetTransformParameterMap()[0]
+            if downsample:
+                # Apply the coarse-grid transform to the native ADC on the native T2W grid
+                for name, values in self._native_grid_parameters(t2w_path).items():
+                    transform_map[name] = values
+                transformix = sitk.TransformixImageFilter()
+                transformix.LogToConsoleOff()
+                transformix.SetMovingImage(moving_image)
+                transformix.SetTransformParameterMap(transform_map)
+                registered_adc = transformix.Execute()
+            else:
+                registered_adc = elastix.GetResultImage()
+            
+            sitk.WriteImage(registered_adc, str(registered_adc_path))
+            sitk.WriteParameterFile(transform_map, str(transform_params_path))
+            
+            self.logger.info(f"Successfully registered ADC to T2W for patient {patient_id}")
+            return {
+                'patient_id': patient_id,
+                'success': True,
+                'registered_adc_path': str(registered_adc_path),
+                'transform_parameters_path': str(transform_params_path),
+                'output_directory': str(patient_output_dir),
+                'transformix_log': ''
+            }
+        
+        except Exception as e:
+            error_msg = f"Unexpected error for {patient_id}: {str(e)}"
+            self.logger.error(error_msg)
+            return {
+                'patient_id': patient_id,
+                'success': False,
+                'error': error_msg,
+                'error_type': 'unexpected_error'
+            }
+
+    def _register_with_itk_elastix(self,
+                                   patient_id: str,
+                                   adc_path: Path,
+                                   t2w_path: Path,
+                                   patient_output_dir: Path,
+                                   transform_params_path: Path,
+                                   registered_adc_path: Path) -> Dict[str, Any]:
+        """
+        Register ADC to T2W with ITKElastix, producing the same files as the CLI path
+        
+        elastix resamples the ADC once in memory, so no transformix pass is needed.
+        """
+        itk = self._itk
+        try:
+            options = {'parameter_object': self._parameter_object, 'log_to_console': False}
+            if self.number_of_threads:
+                options['number_of_threads'] = self.number_of_threads
+            
+            fixed_image = itk.imread(str(t2w_path), itk.F)     # T2W is fixed (reference)
+            moving_image = itk.imread(str(adc_path), itk.F)    # ADC is moving (gets aligned)
+            downsample = self.registration_downsample_factor > 1
+            
+            registered_adc, transform_parameters = itk.elastix_registration_method(
+                self._downsample_itk(fixed_image) if downsample else fixed_image,
+                self._downsample_itk(moving_image) if downsample else moving_image,
+                **options
+            )
+            
+            if downsample:
+                # Apply the coarse-grid transform to the native ADC on the native T2W grid
+                for name, values in self._native_grid_parameters(t2w_path).items():
+                    transform_parameters.SetParameter(0, name, values)
+                registered_adc = itk.transformix_filter(moving_image, transform_parameters)
+            
+            itk.imwrite(registered_adc, str(registered_adc_path))
+            transform_parameters.WriteParameterFile(str(transform_params_path))
+            
+            self.logger.info(f"Successfully registered ADC to T2W for patient {patient_id}")
+            return {
+                'patient_id': patient_id,
+                'success': True,
+                'registered_adc_path': str(registered_adc_path),
+                'transform_parameters_path': str(transform_params_path),
+                'output_directory': str(patient_output_dir),
+                'transformix_log': ''
+            }
+        
+        except Exception as e:
+            error_msg = f"Unexpected error for {patient_id}: {str(e)}"
+            self.logger.error(error_msg)
+            return {
+                'patient_id': patient_id,
+                'success': False,
+                'error': error_msg,
+                'error_type': 'unexpected_error'
+            }
+
+    def _downsample_itk(self, image):
+        """ITK counterpart of _downsample for the ITKElastix backend"""
+        itk = self._itk
+        factor = self.registration_downsample_factor
+        return itk.resample_image_filter(
+            image,
+            size=[max(1, -(-n // factor)) for n in itk.size(image)],
+            output_spacing=[s * factor for s in itk.spacing(image)],
+            output_origin=itk.origin(image),
+            output_direction=image.GetDirection()
+        )
+
 class PranavBatchProcessor(PipelineStep):
     """
     Batch processor using Pranav's directory structure and approach
@@ -247,11 +649,18 @@ class PranavBatchProcessor(PipelineStep):
     
     def __init__(self, 
                  elastix_installation_path: Optional[str] = None,
-                 rigid_params_path: Optional[str] = None):
+                 rigid_params_path: Optional[str] = None,
+                 max_workers: Optional[int] = None,
+                 registration_downsample_factor: int = 1):
         super().__init__("PranavBatchProcessor", "Batch ADC-T2W registration using Pranav's approach")
         
+        self.elastix_installation_path = elastix_installation_path
+        # Sequential unless the caller opts in to worker processes
+        self.max_workers = max_workers or 1
+        
         self.registration_engine = PranavRegistrationEngine(
-            elastix_installation_path, rigid_params_path
+            elastix_installation_path, rigid_params_path,
+            registration_downsample_factor=registration_downsample_factor
         )
     
     def execute(self, data: Dict[str, Any], **kwargs) -> Dict[str, Any]:
@@ -261,14 +670,17 @@ class PranavBatchProcessor(PipelineStep):
         
         base_dir = Path(data['base_directory'])
         output_dir = Path(data['output_directory'])
-        
-        # Find patient directories (following Pranav's logic)
-        patient_dirs = [
-            d for d in base_dir.iterdir() 
-            if d.is_dir() 
-            and not d.name.startswith('._') 
-            and d.name != '.DS_Store'
-        ]
+        force = data.get('force', False)
+        
+        # Find patient directories (following Pranav's logic); scandir entries
+        # answer is_dir() from the directory listing without a stat per entry
+        with os.scandir(base_dir) as entries:
+            patient_dirs = [
+                Path(e.path) for e in entries
+                if e.is_dir() 
+                and not e.name.startswith('._') 
+                and e.name != '.DS_Store'
+            ]
         
         self.logger.info(f"Found {len(patient_dirs)} patient directories")
         
@@ -281,45 +693,57 @@ class PranavBatchProcessor(PipelineStep):
             'summary': {}
         }
         
+        import csv
+        
         # Error logging (following Pranav's CSV approach)
         error_log_path = output_dir / 'registration_errors.csv'
+        # Full per-patient results (including tool log locations) are streamed to disk
+        results_log_path = output_dir / 'registration_results.jsonl'
         output_dir.mkdir(parents=True, exist_ok=True)
         
-        with open(error_log_path, 'w', newline='') as error_file:
+        # Large buffers: rows reach disk in a few writes when the files are closed
+        with open(error_log_path, 'w', newline='', buffering=1 << 20) as error_file, \
+                open(results_log_path, 'w', buffering=1 << 20) as results_file:
             error_writer = csv.writer(error_file)
             error_writer.writerow(['PatientID', 'Error', 'Timestamp'])
             
-            for patient_dir in patient_dirs:
-                patient_id = patient_dir.name
-                self.logger.info(f"Processing patient: {patient_id}")
-                
-                # Check for required files
-                adc_path = patient_dir / f"{patient_id}_adc.nii.gz"
-                t2w_path = patient_dir / f"{patient_id}_t2w.nii.gz"
-                
-                if not adc_path.exists():
-                    error_msg = f"ADC file not found: {adc_path}"
-                    self.logger.warning(error_msg)
-                    error_writer.writerow([patient_id, error_msg, datetime.now().isoformat()])
-                    results['failed'].append(patient_id)
-                    continue
-                
-                if not t2w_path.exists():
-                    error_msg = f"T2W file not found: {t2w_path}"
-                    self.logger.warning(error_msg)
-                    error_writer.writerow([patient_id, error_msg, datetime.now().isoformat()])
-                    results['failed'].append(patient_id)
-                    continue
+            def pending_tasks():
+                # File checks run ahead in a background thread, so checking the
+                # next patients overlaps with the registrations in progress
+                for patient_id, adc_path, t2w_path, adc_exists, t2w_exists in _prefetch(
+                        self._probe_inputs(patient_dirs)):
+                    self.logger.info(f"Processing patient: {patient_id}")
+                    
+                    if not adc_exists:
+                        error_msg = f"ADC file not found: {adc_path}"
+                        self.logger.warning(error_msg)
+                        error_writer.writerow([patient_id, error_msg, _timestamp()])
+                        results['failed'].append(patient_id)
+                        continue
+                    
+                    if not t2w_exists:
+                        error_msg = f"T2W file not found: {t2w_path}"
+                        self.logger.warning(error_msg)
+                        error_writer.writerow([patient_id, error_msg, _timestamp()])
+                        results['failed'].append(patient_id)
+                        continue
+                    
+                    yield {
+                        'patient_id': patient_id,
+                        'adc_path': adc_path,
+                        't2w_path': t2w_path,
+                        'output_dir': output_dir,
+                        'force': force
+                    }
+            
+            # Run registrations; errors are logged here in the main process
+            for reg_result in self._register_all(pending_tasks(), len(patient_dirs)):
+                patient_id = reg_result['patient_id']
                 
-                # Run registration
-                reg_result = self.registration_engine.register_adc_to_t2w(
-                    patient_id=patient_id,
-                    adc_path=str(adc_path),
-                    t2w_path=str(t2w_path),
-                    output_dir=str(output_dir)
-                )
+                results_file.write(json.dumps(reg_result, separators=(',', ':')) + '\n')
                 
-                # Track results
+                # Track results; tool logs are only kept in the JSON Lines file
+                reg_result.pop('transformix_log', None)
                 results['detailed_results'][patient_id] = reg_result
                 
                 if reg_result['success']:
@@ -330,7 +754,7 @@ class PranavBatchProcessor(PipelineStep):
                     error_writer.writerow([
                         patient_id, 
                         reg_result.get('error', 'Unknown error'),
-                        datetime.now().isoformat()
+                        _timestamp()
                     ])
                     self.logger.error(f"✗ Failed to process {patient_id}")
         
@@ -340,12 +764,153 @@ class PranavBatchProcessor(PipelineStep):
             'success_rate': success_rate,
             'successful_count': len(results['successful']),
             'failed_count': len(results['failed']),
-            'error_log_path': str(error_log_path)
+            'error_log_path': str(error_log_path),
+            'results_log_path': str(results_log_path)
         }
         
         self.logger.info(f"Batch processing complete: {success_rate:.1%} success rate")
         
         return results
+    
+    @staticmethod
+    def _probe_inputs(patient_dirs: List[Path]) -> Iterator[Tuple[str, Path, Path, bool, bool]]:
+        """Yield each patient's expected ADC/T2W paths and whether they exist"""
+        for patient_dir in patient_dirs:
+            patient_id = patient_dir.name
+            adc_path = patient_dir / f"{patient_id}_adc.nii.gz"
+            t2w_path = patient_dir / f"{patient_id}_t2w.nii.gz"
+            yield patient_id, adc_path, t2w_path, adc_path.exists(), t2w_path.exists()
+    
+    def _register_all(self, tasks: Iterable[Dict[str, Any]], num_patients: int):
+        """
+        Yield registration results in task order
+        
+        Patients are registered in parallel worker processes when more than one
+        worker is configured; elastix threading is divided between the workers.
+        At most two tasks per worker are submitted ahead of the result being
+        yielded, so tasks are drawn from the iterable as the window advances.
+        """
+        workers = min(self.max_workers, num_patients)
+        
+        if workers <= 1:
+            for task in tasks:
+                yield self.registration_engine.register_adc_to_t2w(**task)
+            return
+        
+        self.logger.info(f"Registering up to {num_patients} patients in parallel ({workers} workers)")
+        
+        engine_config = {
+            'elastix_installation_path': self.elastix_installation_path,
+            'rigid_params_path': self.registration_engine.rigid_params_path,
+            'number_of_threads': max(1, (os.cpu_count() or 1) // workers),
+            'registration_downsample_factor': self.registration_engine.registration_downsample_factor
+        }
+        
+        # The pool is only needed here; imported late to keep module import light
+        import concurrent.futures
+        import multiprocessing
+        
+        # Keep a bounded window of futures in flight, yielded in submission order
+        max_in_flight = workers * 2
+        in_flight = collections.deque()
+        
+        # Spawned (not forked) workers start without inherited ITK thread state
+        mp_context = multiprocessing.get_context("spawn")
+        
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers, mp_context=mp_context) as executor:
+            for task in tasks:
+                in_flight.append(executor.submit(_register_one_patient, dict(task, **engine_config)))
+                if len(in_flight) >= max_in_flight:
+                    yield in_flight.popleft().result()
+            
+            while in_flight:
+                yield in_flight.popleft().result()
+
+def _timestamp() -> str:
+    """Local time as an ISO 8601 string (second resolution) for error log rows"""
+    return time.strftime('%Y-%m-%dT%H:%M:%S')
+
+def _prefetch(items: Iterable, maxsize: int = 2) -> Iterator:
+    """
+    Iterate over items in a background thread, keeping up to maxsize ready
+    
+    Used for cheap I/O-bound work (file checks) that can run ahead of the
+    registrations consuming it; exceptions are re-raised in the consumer.
+    If the consumer stops early, the producer thread notices and exits
+    instead of blocking on the full queue.
+    """
+    import queue
+    import threading
+    
+    ready = queue.Queue(maxsize=maxsize)
+    stop = threading.Event()
+    done = object()
+    
+    def put(entry) -> bool:
+        while not stop.is_set():
+            try:
+                ready.put(entry, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+    
+    def produce():
+        try:
+            for item in items:
+                if not put((item, None)):
+                    return
+        except Exception as e:
+            put((None, e))
+        else:
+            put((done, None))
+    
+    threading.Thread(target=produce, daemon=True).start()
+    
+    try:
+        while True:
+            item, error = ready.get()
+            if error is not None:
+                raise error
+            if item is done:
+                return
+            yield item
+    finally:
+        stop.set()
+
+# Registration engine of the current worker process, built on its first task
+_WORKER_ENGINE: Optional[PranavRegistrationEngine] = None
+
+def _register_one_patient(task: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Register a single patient inside a worker process
+    
+    Module-level so it can be pickled by ProcessPoolExecutor.
+    """
+    global _WORKER_ENGINE
+    patient_id = task['patient_id']
+    try:
+        if _WORKER_ENGINE is None:
+            _WORKER_ENGINE = PranavRegistrationEngine(
+                task['elastix_installation_path'],
+                task['rigid_params_path'],
+                number_of_threads=task['number_of_threads'],
+                registration_downsample_factor=task['registration_downsample_factor']
+            )
+        return _WORKER_ENGINE.register_adc_to_t2w(
+            patient_id=patient_id,
+            adc_path=task['adc_path'],
+            t2w_path=task['t2w_path'],
+            output_dir=task['output_dir'],
+            force=task['force']
+        )
+    except Exception as e:
+        return {
+            'patient_id': patient_id,
+            'success': False,
+            'error': f"Unexpected error for {patient_id}: {str(e)}",
+            'error_type': 'unexpected_error'
+        }
 
 class ProstateADCRegistrationPipeline(BasePipeline):
     """
@@ -353,28 +918,39 @@ class ProstateADCRegistrationPipeline(BasePipeline):
     Professional wrapper around Pranav's approach
     """
     
+    # Runs a whole cohort; the collector stays active between patients
+    PAUSE_GC = False
+    
     def __init__(self, 
                  elastix_installation_path: Optional[str] = None,
-                 rigid_params_path: Optional[str] = None):
+                 rigid_params_path: Optional[str] = None,
+                 max_workers: Optional[int] = None,
+                 registration_downsample_factor: int = 1):
         super().__init__(
             name="ProstateADCRegistrationPipeline",
             description="Professional ADC-T2W registration pipeline based on Pranav's approach"
         )
         
         # Add pipeline steps
-        self.add_step(PranavBatchProcessor(elastix_installation_path, rigid_params_path))
+        self.add_step(PranavBatchProcessor(
+            elastix_installation_path, rigid_params_path, max_workers, registration_downsample_factor
+        ))
     
     def process_patient_directory(self,
                                  base_directory: str,
                                  output_directory: str,
-                                 generate_report: bool = True) -> Dict[str, Any]:
+                                 generate_report: bool = True,
+                                 force: bool = False) -> Dict[str, Any]:
         """
         Process entire patient directory using Pranav's structure
+        
+        Patients registered by a previous run are skipped unless force is set.
         """
         
         input_data = {
             'base_directory': base_directory,
-            'output_directory': output_directory
+            'output_directory': output_directory,
+            'force': force
         }
         
         # Execute pipeline
@@ -389,7 +965,7 @@ class ProstateADCRegistrationPipeline(BasePipeline):
     def _generate_summary_report(self, results: Dict[str, Any], output_dir: str):
         """Generate comprehensive summary report"""
         
-        report_path = Path(output_dir) / 'registration_summary_report.json'
+        report_path = Path(output_dir) / 'registration_summary_report.json.gz'
         
         # Extract batch results
         batch_results = results['step_results']['PranavBatchProcessor']['result']
@@ -402,12 +978,13 @@ class ProstateADCRegistrationPipeline(BasePipeline):
             },
             'processing_summary': batch_results['summary'],
             'successful_patients': batch_results['successful'],
-            'failed_patients': batch_results['failed'],
-            'detailed_results': batch_results['detailed_results']
+            'failed_patients': batch_results['failed']
         }
         
-        # Save report
-        with open(report_path, 'w') as f:
-            json.dump(report, f, indent=2)
+        import gzip
+        
+        # Save report; compact and gzipped, since the patient lists grow with the cohort
+        with gzip.open(report_path, 'wt', compresslevel=1) as f:
+            json.dump(report, f, separators=(',', ':'))
         
         self.logger.info(f"Summary report saved: {report_path}")
@@ -16,6 +16,9 @@ class UnifiedBatchPipeline(BasePipeline):
     or the new comprehensive preprocessing
     """
     
+    # Runs a whole cohort; the collector stays active between patients
+    PAUSE_GC = False
+    
     def __init__(self, 
                  mode: str = 'comprehensive',
                  elastix_path: Optional[str] = None,
@@ -1,11 +1,21 @@
-
 """
 Co-registration module for medical image alignment
 """
 
-from .rigid_registration import RigidRegistration
-from .affine_registration import AffineRegistration
-from .bspline_registration import BSplineRegistration
 from .registration_factory import RegistrationFactory
 
+# Registration classes are resolved lazily so importing the package stays cheap
+_LAZY_CLASSES = {
+    'RigidRegistration': '.rigid_registration',
+    'AffineRegistration': '.affine_registration',
+    'BSplineRegistration': '.bspline_registration',
+}
+
+def __getattr__(name):
+    if name in _LAZY_CLASSES:
+        import importlib
+        module = importlib.import_module(_LAZY_CLASSES[name], __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 __all__ = ['RigidRegistration', 'AffineRegistration', 'BSplineRegistration', 'RegistrationFactory']
\ No newline at end of file
@@ -27,16 +27,18 @@ class AffineRegistration(BaseRegistration):
         super().__init__(parameter_file=parameter_file, **kwargs)
         self.transform_type = "AffineTransform"
     
-    def get_transform(self) -> sitk.Transform:
+    def get_transform(self, fixed_image: sitk.Image, moving_image: sitk.Image) -> sitk.Transform:
         """
         Get affine transform
         In 3D: 12 parameters (9 matrix elements + 3 translations)
+        
+        Centered on the intensity centers of mass of the actual images, so the
+        optimizer starts from an aligned pose instead of recovering one.
         """
-        dimension = 3
         transform = sitk.CenteredTransformInitializer(
-            sitk.AffineTransform(dimension),
-            sitk.Image([1, 1, 1], sitk.sitkUInt8),  # Dummy
-            sitk.Image([1, 1, 1], sitk.sitkUInt8),
-            sitk.CenteredTransformInitializerFilter.GEOMETRY
+            fixed_image,
+            moving_image,
+            sitk.AffineTransform(fixed_image.GetDimension()),
+            sitk.CenteredTransformInitializerFilter.MOMENTS
         )
         return transform
\ No newline at end of file
@@ -6,8 +6,35 @@ import numpy as np
 from abc import ABC, abstractmethod
 from typing import Dict, Any, Optional, Tuple
 import logging
+import functools
+import re
 from pathlib import Path
 
+# One "(Name value ...)" entry of an elastix parameter file, with an optional trailing comment
+_PARAM_RE = re.compile(r'^\s*\(\s*([A-Za-z_]\w*)\s+(.+?)\s*\)\s*(?://.*)?$', re.MULTILINE)
+
+@functools.lru_cache(maxsize=4)
+def _read_image_cached(path: str, mtime: float) -> sitk.Image:
+    """
+    Read an image once per file version (path, modification time)
+    
+    The returned image is shared between callers and must not be modified.
+    """
+    return sitk.ReadImage(path)
+
+def _as_float32(image: sitk.Image) -> sitk.Image:
+    """
+    Return image as sitkFloat32, as the registration metrics require
+    
+    The cast is made once per register() call and handed to every step that
+    needs it. It is not cached across calls, so an image modified in place is
+    never served a stale copy; chained stages avoid the cast by passing
+    float32 images, which are returned untouched.
+    """
+    if image.GetPixelID() == sitk.sitkFloat32:
+        return image
+    return sitk.Cast(image, sitk.sitkFloat32)
+
 class BaseRegistration(ABC):
     """
     Base class for all registration methods
@@ -19,7 +46,8 @@ class BaseRegistration(ABC):
                  optimizer: str = "AdaptiveStochasticGradientDescent",
                  interpolator: str = "LinearInterpolator",
                  number_of_resolutions: int = 3,
-                 parameter_file: Optional[str] = None):
+                 parameter_file: Optional[str] = None,
+                 final_interpolator: int = sitk.sitkLinear):
         """
         Initialize registration with elastix-compatible parameters
         
@@ -29,11 +57,14 @@ class BaseRegistration(ABC):
             interpolator: Interpolation method (Section 2.5)
             number_of_resolutions: Multi-resolution levels (Section 2.8)
             parameter_file: Optional path to elastix parameter file
+            final_interpolator: SimpleITK interpolator for the final resample
+                (linear by default, as FinalBSplineInterpolationOrder 1)
         """
         self.metric = metric
         self.optimizer = optimizer
         self.interpolator = interpolator
         self.number_of_resolutions = number_of_resolutions
+        self.final_interpolator = final_interpolator
         self.logger = logging.getLogger(__name__)
         
         # Initialize SimpleITK registration
@@ -48,23 +79,11 @@ class BaseRegistration(ABC):
         """Load registration parameters from elastix parameter file"""
         if not Path(parameter_file).exists():
             raise FileNotFoundError(f"Parameter file not found: {parameter_file}")
-            
-        # Read parameter file
-        with open(parameter_file, 'r') as f:
-            params = f.readlines()
-        
-        # Parse parameters
-        param_dict = {}
-        for line in params:
-            line = line.strip()
-            if line and not line.startswith('//'):
-                # Extract parameter name and value
-                if '(' in line and ')' in line:
-                    param = line.split('(')[1].split(')')[0].split(' ')
-                    if len(param) >= 2:
-                        name = param[0]
-                        value = ' '.join(param[1:]).strip('"')
-                        param_dict[name] = value
+        
+        # Parsed once per file version and shared by all registration instances
+        param_dict = self._parse_parameter_file(
+            str(parameter_file), Path(parameter_file).stat().st_mtime
+        )
         
         # Set registration parameters
         if 'Metric' in param_dict:
@@ -103,9 +122,22 @@ class BaseRegistration(ABC):
                 float(param_dict['NumberOfSpatialSamples']) / 10000
             )
     
+    @staticmethod
+    @functools.lru_cache(maxsize=16)
+    def _parse_parameter_file(parameter_file: str, mtime: float) -> Dict[str, str]:
+        """
+        Parse an elastix parameter file into a name -> value dict
+        
+        Cached by (path, modification time), so an edited file is re-read.
+        The returned dict is shared and must not be modified.
+        """
+        text = Path(parameter_file).read_text()
+        
+        return {match.group(1): match.group(2).strip('"') for match in _PARAM_RE.finditer(text)}
+    
     @abstractmethod
-    def get_transform(self) -> sitk.Transform:
-        """Get the specific transform type"""
+    def get_transform(self, fixed_image: sitk.Image, moving_image: sitk.Image) -> sitk.Transform:
+        """Get the specific transform type, initialized from the images being registered"""
         pass
     
     def _setup_registration(self):
@@ -143,6 +175,14 @@ class BaseRegistration(ABC):
             smoothingSigmas=[2, 1, 0][:self.number_of_resolutions]
         )
     
+    def _set_initial_transform(self, transform: sitk.Transform) -> None:
+        """Hand the initial transform to the registration method"""
+        self.registration_method.SetInitialTransform(transform)
+    
+    def _resampling_transform(self, final_transform: sitk.Transform) -> sitk.Transform:
+        """Full fixed-to-moving mapping for the optimized transform (itself by default)"""
+        return final_transform
+    
     def register(self, 
                  fixed_image: sitk.Image, 
                  moving_image: sitk.Image,
@@ -162,9 +202,13 @@ class BaseRegistration(ABC):
         """
         self.logger.info(f"Starting {self.__class__.__name__} registration")
         
+        # Metrics work on float images; the original moving image is resampled below
+        fixed_float = _as_float32(fixed_image)
+        moving_float = _as_float32(moving_image)
+        
         # Set up transform
-        initial_transform = self.get_transform()
-        self.registration_method.SetInitialTransform(initial_transform)
+        initial_transform = self.get_transform(fixed_float, moving_float)
+        self._set_initial_transform(initial_transform)
         
         # Set masks if provided
         if fixed_mask is not None:
@@ -173,16 +217,41 @@ class BaseRegistration(ABC):
             self.registration_method.SetMetricMovingMask(moving_mask)
         
         # Execute registration
-        final_transform = self.registration_method.Execute(fixed_image, moving_image)
+        final_transform = self._resampling_transform(
+            self.registration_method.Execute(fixed_float, moving_float)
+        )
         
         # Apply transformation
+        registered_image = self._resample_moving(fixed_image, moving_image, final_transform)
+        
+        self.logger.info("Registration completed successfully")
+        return registered_image, final_transform
+    
+    def _resample_moving(self,
+                         fixed_image: sitk.Image,
+                         moving_image: sitk.Image,
+                         transform: sitk.Transform) -> sitk.Image:
+        """Resample the moving image onto the fixed image grid with the final interpolator"""
         resampler = sitk.ResampleImageFilter()
         resampler.SetReferenceImage(fixed_image)
-        resampler.SetInterpolator(sitk.sitkBSpline)
+        resampler.SetInterpolator(self.final_interpolator)
         resampler.SetDefaultPixelValue(0)
-        resampler.SetTransform(final_transform)
+        resampler.SetTransform(transform)
         
-        registered_image = resampler.Execute(moving_image)
+        return resampler.Execute(moving_image)
+    
+    def register_from_paths(self,
+                            fixed_path: str,
+                            moving_path: str,
+                            fixed_mask: Optional[sitk.Image] = None,
+                            moving_mask: Optional[sitk.Image] = None) -> Tuple[sitk.Image, sitk.Transform]:
+        """
+        Register images given by file path
         
-        self.logger.info("Registration completed successfully")
-        return registered_image, final_transform
\ No newline at end of file
+        Images are read through a small cache, so chained stages on the same
+        pair (e.g. rigid -> affine -> bspline) decode each file only once.
+        """
+        fixed_image = _read_image_cached(str(fixed_path), Path(fixed_path).stat().st_mtime)
+        moving_image = _read_image_cached(str(moving_path), Path(moving_path).stat().st_mtime)
+        
+        return self.register(fixed_image, moving_image, fixed_mask, moving_mask)
\ No newline at end of file
@@ -5,9 +5,13 @@ Based on elastix manual Section 2.6
 """
 import SimpleITK as sitk
 import numpy as np
+import tempfile
 from pathlib import Path
 from .base_registration import BaseRegistration
-from typing import Optional, Tuple
+from typing import List, Optional, Tuple
+
+# Only SimpleElastix builds of SimpleITK ship the elastix filter
+SIMPLE_ELASTIX_AVAILABLE = hasattr(sitk, 'ElastixImageFilter')
 
 class BSplineRegistration(BaseRegistration):
     """
@@ -15,9 +19,13 @@ class BSplineRegistration(BaseRegistration):
     T(x) = x + sum(p_k * beta^3((x-x_k)/sigma))
     """
     
+    # Control points per axis of the final (finest) B-spline grid
+    FINAL_MESH_SIZE = 8
+    
     def __init__(self, 
                  parameter_file: str = None,
                  grid_spacing_schedule: list = None,
+                 use_elastix_recursive: bool = False,
                  **kwargs):
         """
         Initialize B-spline registration
@@ -25,6 +33,9 @@ class BSplineRegistration(BaseRegistration):
         Args:
             parameter_file: Path to elastix parameter file (default: configs/registration/bspline.txt)
             grid_spacing_schedule: Multi-grid spacing factors (overrides parameter file if provided)
+            use_elastix_recursive: Opt in to elastix's RecursiveBSplineTransform
+                (separable B-spline weights) when SimpleElastix is available;
+                by default SimpleITK's registration framework is used
             **kwargs: Additional parameters passed to BaseRegistration
         """
         if parameter_file is None:
@@ -33,18 +44,50 @@ class BSplineRegistration(BaseRegistration):
         
         super().__init__(parameter_file=parameter_file, **kwargs)
         self.transform_type = "BSplineTransform"
+        self.parameter_file = parameter_file
+        self.use_elastix_recursive = use_elastix_recursive and SIMPLE_ELASTIX_AVAILABLE
         
         # Override grid spacing if provided
+        self._grid_spacing_override = grid_spacing_schedule
         self.grid_spacing_schedule = grid_spacing_schedule or [6.0, 4.0, 2.0]
     
-    def get_transform(self) -> sitk.Transform:
+    def get_transform(self, fixed_image: sitk.Image, moving_image: sitk.Image) -> sitk.Transform:
         """
         Get B-spline transform with control point grid
+        
+        The grid starts coarse and is refined at each resolution level up to
+        FINAL_MESH_SIZE (see _mesh_scale_factors).
         """
-        # This will be initialized properly during registration
-        dimension = 3
-        transform = sitk.BSplineTransform(dimension)
-        return transform
+        coarse_mesh_size = self.FINAL_MESH_SIZE // self._mesh_scale_factors()[-1]
+        
+        bspline = sitk.BSplineTransform(fixed_image.GetDimension())
+        bspline.SetTransformDomainOrigin(fixed_image.GetOrigin())
+        bspline.SetTransformDomainDirection(fixed_image.GetDirection())
+        bspline.SetTransformDomainPhysicalDimensions(
+            [size * spacing for size, spacing in 
+             zip(fixed_image.GetSize(), fixed_image.GetSpacing())]
+        )
+        bspline.SetTransformDomainMeshSize([coarse_mesh_size] * fixed_image.GetDimension())
+        return bspline
+    
+    def _mesh_scale_factors(self) -> List[int]:
+        """
+        Mesh refinement per resolution level, relative to the coarsest grid
+        
+        One level per grid_spacing_schedule entry; the grid spacing halves at
+        each level and ends at exactly FINAL_MESH_SIZE, so the finest level
+        optimizes the same grid as a single-level registration would.
+        """
+        levels = len(self.grid_spacing_schedule)
+        finest = self.FINAL_MESH_SIZE.bit_length() - 1
+        mesh_sizes = [2 ** max(0, finest - (levels - 1 - level)) for level in range(levels)]
+        return [size // mesh_sizes[0] for size in mesh_sizes]
+    
+    def _set_initial_transform(self, transform: sitk.Transform) -> None:
+        """Optimize the B-spline coarse-to-fine, refining its mesh at each level"""
+        self.registration_method.SetInitialTransformAsBSpline(
+            transform, inPlace=True, scaleFactors=self._mesh_scale_factors()
+        )
     
     def register(self, 
                  fixed_image: sitk.Image, 
@@ -54,30 +97,100 @@ class BSplineRegistration(BaseRegistration):
         """
         Override to handle multi-resolution B-spline grid
         """
-        # Initialize with rigid/affine first
+        if self.use_elastix_recursive:
+            return self._register_with_elastix(fixed_image, moving_image, fixed_mask, moving_mask)
+        
+        # Initialize with rigid/affine first; it stays fixed while the B-spline is optimized
         initial_transform = sitk.CenteredTransformInitializer(
             fixed_image, moving_image,
             sitk.AffineTransform(fixed_image.GetDimension()),
             sitk.CenteredTransformInitializerFilter.GEOMETRY
         )
+        self.registration_method.SetMovingInitialTransform(initial_transform)
         
-        # Set up B-spline on top of initial alignment
-        transform_domain_mesh_size = [8, 8, 8]  # Initial grid
-        bspline = sitk.BSplineTransform(fixed_image.GetDimension())
-        bspline.SetTransformDomainOrigin(fixed_image.GetOrigin())
-        bspline.SetTransformDomainDirection(fixed_image.GetDirection())
-        bspline.SetTransformDomainPhysicalDimensions(
-            [size * spacing for size, spacing in 
-             zip(fixed_image.GetSize(), fixed_image.GetSpacing())]
+        # One pyramid level per grid spacing in the schedule, coarse to fine
+        levels = len(self.grid_spacing_schedule)
+        self.registration_method.SetShrinkFactorsPerLevel(
+            shrinkFactors=[2 ** level for level in reversed(range(levels))]
+        )
+        self.registration_method.SetSmoothingSigmasPerLevel(
+            smoothingSigmas=list(reversed(range(levels)))
         )
-        bspline.SetTransformDomainMeshSize(transform_domain_mesh_size)
+        self.registration_method.SetOptimizerScalesFromPhysicalShift()
         
-        # Composite transform
-        composite = sitk.CompositeTransform(fixed_image.GetDimension())
-        composite.AddTransform(initial_transform)
-        composite.AddTransform(bspline)
+        return super().register(fixed_image, moving_image, fixed_mask=fixed_mask, moving_mask=moving_mask)
+    
+    def _resampling_transform(self, final_transform: sitk.Transform) -> sitk.Transform:
+        """Compose the optimized B-spline with the fixed affine pre-alignment"""
+        composite = sitk.CompositeTransform(final_transform.GetDimension())
+        composite.AddTransform(self.registration_method.GetMovingInitialTransform())
+        composite.AddTransform(final_transform)
+        return composite
+    
+    def _register_with_elastix(self,
+                               fixed_image: sitk.Image,
+                               moving_image: sitk.Image,
+                               fixed_mask: Optional[sitk.Image] = None,
+                               moving_mask: Optional[sitk.Image] = None) -> Tuple[sitk.Image, sitk.Transform]:
+        """
+        Register with elastix's RecursiveBSplineTransform through SimpleElastix
         
-        self.registration_method.SetInitialTransform(composite)
-        self.registration_method.SetOptimizerScalesFromPhysicalShift()
+        The parameter file drives elastix directly; the resulting transform is
+        converted to a SimpleITK B-spline so the output matches the other path.
+        """
+        self.logger.info("Starting BSplineRegistration registration (elastix RecursiveBSplineTransform)")
         
-        return super().register(fixed_image, moving_image, fixed_mask=fixed_mask, moving_mask=moving_mask)
\ No newline at end of file
+        parameter_map = sitk.ReadParameterFile(self.parameter_file)
+        parameter_map['Transform'] = ['RecursiveBSplineTransform']
+        parameter_map['FixedImagePyramid'] = ['FixedSmoothingImagePyramid']
+        # The registered image is resampled from the returned transform below
+        parameter_map['WriteResultImage'] = ['false']
+        
+        if self._grid_spacing_override:
+            parameter_map['GridSpacingSchedule'] = [str(float(s)) for s in self._grid_spacing_override]
+            parameter_map['NumberOfResolutions'] = [str(len(self._grid_spacing_override))]
+        
+        # The sparse-mask sampler cannot run without a fixed mask
+        if fixed_mask is None and 'ImageSampler' in parameter_map \
+                and parameter_map['ImageSampler'][0] == 'RandomSparseMask':
+            parameter_map['ImageSampler'] = ['Random']
+        
+        elastix = sitk.ElastixImageFilter()
+        elastix.LogToConsoleOff()
+        elastix.SetFixedImage(fixed_image)
+        elastix.SetMovingImage(moving_image)
+        if fixed_mask is not None:
+            elastix.SetFixedMask(sitk.Cast(fixed_mask, sitk.sitkUInt8))
+        if moving_mask is not None:
+            elastix.SetMovingMask(sitk.Cast(moving_mask, sitk.sitkUInt8))
+        elastix.SetParameterMap(parameter_map)
+        
+        # elastix writes its transform and iteration files to the output directory
+        with tempfile.TemporaryDirectory() as output_dir:
+            elastix.SetOutputDirectory(output_dir)
+            elastix.Execute()
+        
+        final_transform = self._transform_from_elastix(elastix.GetTransformParameterMap()[0])
+        registered_image = self._resample_moving(fixed_image, moving_image, final_transform)
+        
+        self.logger.info("Registration completed successfully")
+        return registered_image, final_transform
+    
+    @staticmethod
+    def _transform_from_elastix(transform_map) -> sitk.BSplineTransform:
+        """Build the SimpleITK B-spline equivalent of an elastix B-spline transform parameter map"""
+        dimension = len(transform_map['GridSize'])
+        order = int(transform_map['BSplineTransformSplineOrder'][0]) \
+            if 'BSplineTransformSplineOrder' in transform_map else 3
+        
+        # elastix lists GridDirection column by column; SimpleITK expects rows
+        grid_direction = [float(v) for v in transform_map['GridDirection']]
+        fixed_parameters = [float(v) for key in ('GridSize', 'GridOrigin', 'GridSpacing')
+                            for v in transform_map[key]]
+        fixed_parameters += [grid_direction[col * dimension + row]
+                             for row in range(dimension) for col in range(dimension)]
+        
+        transform = sitk.BSplineTransform(dimension, order)
+        transform.SetFixedParameters(fixed_parameters)
+        transform.SetParameters([float(v) for v in transform_map['TransformParameters']])
+        return transform
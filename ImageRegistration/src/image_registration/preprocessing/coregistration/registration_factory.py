@@ -2,21 +2,20 @@
 """
 Factory pattern for creating registration instances
 """
+import importlib
 from typing import Dict, Any
-from .rigid_registration import RigidRegistration
-from .affine_registration import AffineRegistration
-from .bspline_registration import BSplineRegistration
 
 class RegistrationFactory:
     """
     Factory for creating registration instances based on type
     """
     
+    # Classes are imported on first use so only the requested module is loaded
     REGISTRATION_TYPES = {
-        'rigid': RigidRegistration,
-        'affine': AffineRegistration,
-        'bspline': BSplineRegistration,
-        'nonrigid': BSplineRegistration  # Alias
+        'rigid': '.rigid_registration:RigidRegistration',
+        'affine': '.affine_registration:AffineRegistration',
+        'bspline': '.bspline_registration:BSplineRegistration',
+        'nonrigid': '.bspline_registration:BSplineRegistration'  # Alias
     }
     
     @classmethod
@@ -36,5 +35,7 @@ class RegistrationFactory:
         if registration_type.lower() not in cls.REGISTRATION_TYPES:
             raise ValueError(f"Unknown registration type: {registration_type}")
         
-        registration_class = cls.REGISTRATION_TYPES[registration_type.lower()]
+        module_path, class_name = cls.REGISTRATION_TYPES[registration_type.lower()].split(':')
+        module = importlib.import_module(module_path, __package__)
+        registration_class = getattr(module, class_name)
         return registration_class(**kwargs)
\ No newline at end of file
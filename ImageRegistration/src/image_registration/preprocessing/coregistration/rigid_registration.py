@@ -27,16 +27,18 @@ class RigidRegistration(BaseRegistration):
         super().__init__(parameter_file=parameter_file, **kwargs)
         self.transform_type = "Euler3DTransform"
     
-    def get_transform(self) -> sitk.Transform:
+    def get_transform(self, fixed_image: sitk.Image, moving_image: sitk.Image) -> sitk.Transform:
         """
         Get Euler transform for rigid registration
         In 3D: 6 parameters (3 rotations + 3 translations)
+        
+        Centered on the geometric centers of the actual images passed in by
+        register, rather than on throwaway 1x1x1 placeholder images.
         """
-        dimension = 3  # For medical images
         transform = sitk.CenteredTransformInitializer(
+            fixed_image,
+            moving_image,
             sitk.Euler3DTransform(),
-            sitk.Image([1, 1, 1], sitk.sitkUInt8),  # Dummy for initialization
-            sitk.Image([1, 1, 1], sitk.sitkUInt8),
             sitk.CenteredTransformInitializerFilter.GEOMETRY
         )
         return transform
\ No newline at end of file
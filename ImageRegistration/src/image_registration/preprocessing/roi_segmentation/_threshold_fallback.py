@@ -0,0 +1,19 @@
+# src/image_registration/preprocessing/roi_segmentation/_threshold_fallback.py
+"""
+Shared preprocessing for the threshold-based segmentation fallbacks
+"""
+import SimpleITK as sitk
+
+def smoothed_for_threshold(image: sitk.Image) -> sitk.Image:
+    """
+    Return the image smoothed for Otsu thresholding
+    
+    ProstateSegmentor and ROIExtractor smooth with the same settings before
+    thresholding. A new filter is created per call, like the other fallback
+    filters, so concurrent callers never share filter state; it runs with
+    ITK's global thread setting.
+    """
+    smoother = sitk.SmoothingRecursiveGaussianImageFilter()
+    smoother.SetSigma(2.0)
+    smoother.SetNormalizeAcrossScale(False)
+    return smoother.Execute(image)
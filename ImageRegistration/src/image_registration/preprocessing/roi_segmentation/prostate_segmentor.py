@@ -7,6 +7,7 @@ import SimpleITK as sitk
 import numpy as np
 from typing import Optional
 import logging
+from ._threshold_fallback import smoothed_for_threshold
 
 class ProstateSegmentor:
     """
@@ -54,8 +55,8 @@ class ProstateSegmentor:
         """
         Simple threshold-based segmentation as fallback
         """
-        # Preprocessing
-        smoothed = sitk.SmoothingRecursiveGaussian(image, 2.0)
+        # Preprocessing (same smoothing as ROIExtractor's fallback)
+        smoothed = smoothed_for_threshold(image)
         
         # Multi-Otsu thresholding
         otsu_filter = sitk.OtsuMultipleThresholdsImageFilter()
@@ -69,16 +70,11 @@ class ProstateSegmentor:
         binary = sitk.BinaryMorphologicalClosing(binary, [5, 5, 5])
         binary = sitk.BinaryMorphologicalOpening(binary, [3, 3, 3])
         
-        # Keep largest connected component
-        cc_filter = sitk.ConnectedComponentImageFilter()
-        labeled = cc_filter.Execute(binary)
-        
-        stats = sitk.LabelShapeStatisticsImageFilter()
-        stats.Execute(labeled)
-        
-        if stats.GetNumberOfLabels() > 0:
-            largest_label = max(stats.GetLabels(), 
-                              key=lambda l: stats.GetNumberOfPixels(l))
-            binary = sitk.BinaryThreshold(labeled, largest_label, largest_label, 1, 0)
+        # Keep largest connected component (relabeling sorts components by
+        # size, so the largest becomes label 1)
+        relabel_filter = sitk.RelabelComponentImageFilter()
+        relabel_filter.SetSortByObjectSize(True)
+        labeled = relabel_filter.Execute(sitk.ConnectedComponent(binary))
+        binary = sitk.BinaryThreshold(labeled, 1, 1, 1, 0)
         
         return binary
\ No newline at end of file
@@ -4,8 +4,9 @@ ROI extraction utilities
 """
 import SimpleITK as sitk
 import numpy as np
-from typing import Tuple, Optional, Dict
+from typing import Tuple, Optional, Dict, List
 import logging
+from ._threshold_fallback import smoothed_for_threshold
 
 class ROIExtractor:
     """
@@ -15,6 +16,44 @@ class ROIExtractor:
     def __init__(self):
         self.logger = logging.getLogger(__name__)
     
+    def compute_bounding_box(self, mask: sitk.Image) -> Tuple[int, ...]:
+        """
+        Bounding box of the mask label as (start..., size...) in index space
+        
+        Uses per-axis any() reductions rather than full label shape statistics.
+        """
+        label = sitk.GetArrayViewFromImage(mask) == 1  # Assuming label 1
+        if not label.any():
+            raise ValueError("Mask contains no voxels with label 1")
+        
+        # Array axes are reversed relative to SimpleITK index order (z, y, x)
+        start, size = [], []
+        for axis in reversed(range(label.ndim)):
+            other_axes = tuple(a for a in range(label.ndim) if a != axis)
+            occupied = np.flatnonzero(label.any(axis=other_axes))
+            start.append(int(occupied[0]))
+            size.append(int(occupied[-1] - occupied[0] + 1))
+        
+        return tuple(start + size)
+    
+    def padded_region(self,
+                      bbox: Tuple[int, ...],
+                      image_size: Tuple[int, ...],
+                      padding: int = 10) -> Tuple[List[int], List[int]]:
+        """
+        Pad a bounding box and clip it to the image extent
+        
+        Returns:
+            Region start index and size
+        """
+        dim = len(bbox) // 2
+        start = [max(0, bbox[i] - padding) for i in range(0, dim)]
+        size = [min(image_size[i] - start[i], 
+                    bbox[i + dim] + 2*padding) 
+                for i in range(0, dim)]
+        
+        return start, size
+    
     def extract_bounding_box(self, 
                            image: sitk.Image, 
                            mask: sitk.Image,
@@ -31,16 +70,8 @@ class ROIExtractor:
             Cropped image and mask
         """
         # Get bounding box
-        label_shape_filter = sitk.LabelShapeStatisticsImageFilter()
-        label_shape_filter.Execute(mask)
-        
-        bbox = label_shape_filter.GetBoundingBox(1)  # Assuming label 1
-        
-        # Add padding
-        start = [max(0, bbox[i] - padding) for i in range(0, len(bbox)//2)]
-        size = [min(image.GetSize()[i] - start[i], 
-                    bbox[i + len(bbox)//2] + 2*padding) 
-                for i in range(0, len(bbox)//2)]
+        bbox = self.compute_bounding_box(mask)
+        start, size = self.padded_region(bbox, image.GetSize(), padding)
         
         # Extract ROI
         roi_image = sitk.RegionOfInterest(image, size, start)
@@ -67,8 +98,8 @@ class ROIExtractor:
             # Use simple thresholding as fallback
             self.logger.warning("No segmentation provided, using threshold-based extraction")
             
-            # Smooth image
-            smoothed = sitk.SmoothingRecursiveGaussian(t2w_image, 2.0)
+            # Smooth image (same smoothing as ProstateSegmentor's fallback)
+            smoothed = smoothed_for_threshold(t2w_image)
             
             # Otsu threshold
             otsu_filter = sitk.OtsuThresholdImageFilter()
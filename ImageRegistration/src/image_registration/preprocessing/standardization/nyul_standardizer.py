@@ -3,17 +3,74 @@
 Nyul intensity standardization method
 Referenced in elastix manual and commonly used for MRI standardization
 """
+import os
+import concurrent.futures
+import multiprocessing
 import SimpleITK as sitk
 import numpy as np
-from typing import List, Tuple
+from typing import Iterable, List, Optional, Tuple, Union
 from .intensity_standardizer import IntensityStandardizer
 
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _nyul_apply(flat, img_lm, std_lm, out):
+        """
+        Piecewise-linear landmark mapping with background zeroing in one pass
+        
+        Matches np.interp (clamped at the end landmarks) followed by zeroing
+        non-positive voxels.
+        """
+        last = img_lm.size - 1
+        for i in prange(flat.size):
+            v = flat[i]
+            if v <= 0:
+                out[i] = 0
+            elif v <= img_lm[0]:
+                out[i] = std_lm[0]
+            elif v >= img_lm[last]:
+                out[i] = std_lm[last]
+            else:
+                k = np.searchsorted(img_lm, v, side='right') - 1
+                out[i] = std_lm[k] + (std_lm[k + 1] - std_lm[k]) * (v - img_lm[k]) / (img_lm[k + 1] - img_lm[k])
+
+def _image_landmarks(source: Union[sitk.Image, str, os.PathLike],
+                     landmarks_percentage: List[float]) -> np.ndarray:
+    """
+    Percentile landmarks of the non-zero voxels of one training image
+    
+    Module-level so it can be pickled by ProcessPoolExecutor; file paths are
+    read here so workers load their own volumes.
+    """
+    img = source if isinstance(source, sitk.Image) else sitk.ReadImage(os.fspath(source))
+    
+    # Read-only view of the voxel buffer (no copy)
+    img_array = sitk.GetArrayViewFromImage(img)
+    
+    # Get non-zero voxels (assuming background is 0)
+    non_zero = img_array[img_array > 0]
+    
+    # Calculate percentile landmarks (non_zero is already a private
+    # copy, so the selection can partition it in place)
+    return np.percentile(non_zero, landmarks_percentage, overwrite_input=True)
+
 class NyulStandardizer(IntensityStandardizer):
     """
     Nyul histogram matching standardization
     Maps intensity landmarks to standard scale
     """
     
+    # Volumes from this size on use the fused numba kernel when numba is installed
+    NUMBA_MIN_VOXELS = 1 << 24
+    
+    # Block size for the numpy mapping path
+    INTERP_BLOCK_VOXELS = 1 << 18
+    
     def __init__(self, 
                  landmarks_percentage: List[float] = [0, 10, 20, 30, 40, 50, 60, 70, 80, 90, 100],
                  standard_scale: Tuple[float, float] = (0, 100)):
@@ -28,25 +85,63 @@ class NyulStandardizer(IntensityStandardizer):
         self.landmarks_percentage = landmarks_percentage
         self.standard_scale = standard_scale
         self.standard_landmarks = None
+        self.num_training_images = 0
     
-    def train(self, images: List[sitk.Image]) -> None:
+    def train(self,
+              images: Iterable[Union[sitk.Image, str, os.PathLike]],
+              max_workers: Optional[int] = None) -> None:
         """
         Learn the standard intensity landmarks
+        
+        Images are consumed one at a time, so a generator can be passed to
+        avoid holding all training volumes in memory at once. Entries may also
+        be file paths; unreadable files are skipped with a warning.
+        
+        Args:
+            images: Training images or paths to them
+            max_workers: Compute landmarks in this many worker processes.
+                Pass paths in that case so workers read the volumes
+                themselves instead of receiving pickled images.
         """
-        self.logger.info("Training Nyul standardization on {} images".format(len(images)))
+        self.logger.info("Training Nyul standardization")
         
         all_landmarks = []
         
-        for img in images:
-            # Convert to numpy array
-            img_array = sitk.GetArrayFromImage(img)
+        if max_workers is not None and max_workers > 1:
+            # Spawned (not forked) workers start without inherited ITK thread state
+            mp_context = multiprocessing.get_context("spawn")
             
-            # Get non-zero voxels (assuming background is 0)
-            non_zero = img_array[img_array > 0]
-            
-            # Calculate percentile landmarks
-            landmarks = np.percentile(non_zero, self.landmarks_percentage)
-            all_landmarks.append(landmarks)
+            with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers, mp_context=mp_context) as executor:
+                futures = {
+                    executor.submit(_image_landmarks, source, self.landmarks_percentage): source
+                    for source in images
+                }
+                for future in concurrent.futures.as_completed(futures):
+                    source = futures[future]
+                    try:
+                        all_landmarks.append(future.result())
+                    except concurrent.futures.process.BrokenProcessPool:
+                        raise
+                    except Exception as e:
+                        if isinstance(source, sitk.Image):
+                            raise
+                        self.logger.warning(f"Failed to load training image {source}: {e}")
+        else:
+            for source in images:
+                try:
+                    all_landmarks.append(_image_landmarks(source, self.landmarks_percentage))
+                except Exception as e:
+                    if isinstance(source, sitk.Image):
+                        raise
+                    self.logger.warning(f"Failed to load training image {source}: {e}")
+                
+                # Only the landmarks are kept; release the volume before the next read
+                del source
+        
+        if not all_landmarks:
+            raise ValueError("No training images could be loaded")
+        
+        self.num_training_images = len(all_landmarks)
         
         # Calculate mean landmarks as standard
         self.standard_landmarks = np.mean(all_landmarks, axis=0)
@@ -67,7 +162,7 @@ class NyulStandardizer(IntensityStandardizer):
         self.parameters['landmarks_percentage'] = self.landmarks_percentage
         self.trained = True
         
-        self.logger.info("Training completed")
+        self.logger.info("Training completed on {} images".format(len(all_landmarks)))
     
     def transform(self, image: sitk.Image) -> sitk.Image:
         """
@@ -76,42 +171,47 @@ class NyulStandardizer(IntensityStandardizer):
         if not self.trained:
             raise RuntimeError("Standardizer must be trained before transform")
         
-        # Convert to array
-        img_array = sitk.GetArrayFromImage(image)
-        
-        # Get non-zero mask
-        mask = img_array > 0
-        non_zero = img_array[mask]
-        
-        # Calculate image landmarks
-        img_landmarks = np.percentile(non_zero, self.landmarks_percentage)
-        
-        # Create standardized image
-        standardized = np.zeros_like(img_array)
-        
-        # Apply piecewise linear mapping
-        for i in range(len(self.landmarks_percentage) - 1):
-            # Find voxels in this intensity range
-            lower = img_landmarks[i]
-            upper = img_landmarks[i + 1]
-            mask_range = (img_array >= lower) & (img_array < upper)
+        # Read-only view of the voxel buffer (no copy)
+        img_array = sitk.GetArrayViewFromImage(image)
+        
+        # Calculate image landmarks from non-zero voxels
+        foreground = img_array > 0
+        img_landmarks = np.percentile(
+            img_array[foreground], self.landmarks_percentage, overwrite_input=True
+        )
+        
+        if NUMBA_AVAILABLE and img_array.size >= self.NUMBA_MIN_VOXELS:
+            # Mapping and background zeroing fused into one parallel pass
+            standardized = np.empty(img_array.shape, dtype=np.float32)
+            _nyul_apply(
+                np.ascontiguousarray(img_array).ravel(),
+                np.asarray(img_landmarks, dtype=np.float64),
+                np.asarray(self.standard_landmarks, dtype=np.float64),
+                standardized.ravel()
+            )
+        else:
+            # Apply piecewise linear mapping (np.interp clamps values beyond
+            # the end landmarks). np.interp always returns float64, so it runs
+            # over cache-sized blocks written straight into the float32 output
+            # instead of materializing a full-size float64 temporary.
+            standardized = np.empty(img_array.shape, dtype=np.float32)
+            flat = img_array.ravel()
+            out = standardized.ravel()
+            for start in range(0, flat.size, self.INTERP_BLOCK_VOXELS):
+                stop = start + self.INTERP_BLOCK_VOXELS
+                out[start:stop] = np.interp(flat[start:stop], img_landmarks, self.standard_landmarks)
             
-            # Linear mapping
-            if upper > lower:
-                slope = (self.standard_landmarks[i + 1] - self.standard_landmarks[i]) / (upper - lower)
-                standardized[mask_range] = (
-                    self.standard_landmarks[i] + 
-                    slope * (img_array[mask_range] - lower)
-                )
-        
-        # Handle maximum value
-        standardized[img_array >= img_landmarks[-1]] = self.standard_landmarks[-1]
-        
-        # Preserve zeros
-        standardized[img_array == 0] = 0
+            # Preserve zeros (reusing the foreground mask instead of a second comparison)
+            standardized[~foreground] = 0
         
         # Convert back to SimpleITK image
         standardized_img = sitk.GetImageFromArray(standardized)
         standardized_img.CopyInformation(image)
         
-        return standardized_img
\ No newline at end of file
+        return standardized_img
+    
+    def load_parameters(self, filepath: str) -> None:
+        """Load standardization parameters and restore the learned landmarks"""
+        super().load_parameters(filepath)
+        self.standard_landmarks = np.asarray(self.parameters['standard_landmarks'])
+        self.landmarks_percentage = self.parameters['landmarks_percentage']
\ No newline at end of file
@@ -5,6 +5,7 @@ Simple but effective for many applications
 """
 import SimpleITK as sitk
 import numpy as np
+from typing import Iterable
 from .intensity_standardizer import IntensityStandardizer
 
 class ZScoreStandardizer(IntensityStandardizer):
@@ -24,29 +25,43 @@ class ZScoreStandardizer(IntensityStandardizer):
         self.global_mean = None
         self.global_std = None
     
-    def train(self, images: list) -> None:
+    def train(self, images: Iterable[sitk.Image]) -> None:
         """
         Calculate global statistics from training images
+        
+        Mean/std are accumulated per image, so without robust statistics no
+        voxel values are kept; median/MAD need all non-zero values at once.
         """
         self.logger.info("Training Z-score standardization")
         
-        all_values = []
+        non_zero_values = []
+        total, total_sq, count = 0.0, 0.0, 0
         
         for img in images:
-            img_array = sitk.GetArrayFromImage(img)
+            # Read-only view of the voxel buffer (no copy)
+            img_array = sitk.GetArrayViewFromImage(img)
             # Only use non-zero values
             non_zero = img_array[img_array > 0]
-            all_values.extend(non_zero)
+            count += non_zero.size
+            
+            if self.use_robust_statistics:
+                non_zero_values.append(non_zero)
+            else:
+                non_zero = non_zero.astype(np.float64, copy=False)
+                total += non_zero.sum()
+                total_sq += np.dot(non_zero, non_zero)
         
-        all_values = np.array(all_values)
+        if count == 0:
+            raise ValueError("No non-zero voxels found in the training images")
         
         if self.use_robust_statistics:
+            all_values = np.concatenate(non_zero_values)
             self.global_mean = np.median(all_values)
             # Median absolute deviation
             self.global_std = np.median(np.abs(all_values - self.global_mean)) * 1.4826
         else:
-            self.global_mean = np.mean(all_values)
-            self.global_std = np.std(all_values)
+            self.global_mean = total / count
+            self.global_std = np.sqrt(max(total_sq / count - self.global_mean ** 2, 0.0))
         
         self.parameters['global_mean'] = float(self.global_mean)
         self.parameters['global_std'] = float(self.global_std)
@@ -59,26 +74,31 @@ class ZScoreStandardizer(IntensityStandardizer):
         """
         Apply Z-score standardization
         """
+        # Read-only view of the voxel buffer (no copy)
+        img_array = sitk.GetArrayViewFromImage(image)
+        background = img_array <= 0
+        
         if not self.trained:
-            # Use per-image standardization
-            img_array = sitk.GetArrayFromImage(image)
-            mask = img_array > 0
+            # Use per-image standardization on the non-zero voxels (gathered once)
+            foreground_values = img_array[~background]
             
             if self.use_robust_statistics:
-                mean = np.median(img_array[mask])
-                std = np.median(np.abs(img_array[mask] - mean)) * 1.4826
+                mean = np.median(foreground_values)
+                std = np.median(np.abs(foreground_values - mean)) * 1.4826
             else:
-                mean = np.mean(img_array[mask])
-                std = np.std(img_array[mask])
+                mean = np.mean(foreground_values)
+                std = np.std(foreground_values)
+            del foreground_values
         else:
             mean = self.global_mean
             std = self.global_std
-            img_array = sitk.GetArrayFromImage(image)
-            mask = img_array > 0
         
-        # Standardize
-        standardized = np.zeros_like(img_array)
-        standardized[mask] = (img_array[mask] - mean) / (std + 1e-8)
+        # Standardize with in-place ops on one float32 array allocated per call
+        # (shift, scale and background masking in a single working array)
+        standardized = np.empty(img_array.shape, dtype=np.float32)
+        np.subtract(img_array, mean, out=standardized, casting='unsafe')
+        standardized *= 1.0 / (std + 1e-8)
+        np.putmask(standardized, background, 0.0)
         
         # Convert back
         standardized_img = sitk.GetImageFromArray(standardized)
@@ -0,0 +1,11 @@
+# tests/conftest.py
+"""
+Shared pytest setup: make the package under src/ importable once per session
+"""
+import sys
+from pathlib import Path
+
+# Not needed after `pip install -e .`, where image_registration is already importable
+SRC_DIR = str(Path(__file__).resolve().parent.parent / 'src')
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
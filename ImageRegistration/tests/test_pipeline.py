@@ -1,53 +1,103 @@
 #!/usr/bin/env python3
 """
 Basic tests for the registration pipeline
+
+PYTEST_DONT_REWRITE: unittest assertions only, no bare asserts to rewrite
 """
-import sys
+import tempfile
 import unittest
 from pathlib import Path
 
-# Add src to path
-sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+from image_registration.pipeline.batch_preprocessing import PatientDiscoveryStep
+
+# Imported once for the tests below; the error is kept for their failure messages
+try:
+    from image_registration.pipeline.pranav_registration_pipeline import ProstateADCRegistrationPipeline
+    PIPELINE_IMPORT_ERROR = None
+except ImportError as e:
+    ProstateADCRegistrationPipeline = None
+    PIPELINE_IMPORT_ERROR = e
+
+# What the pipeline raises when elastix (or its parameter files) is not available
+ELASTIX_MISSING = (ImportError, OSError, RuntimeError)
 
 class TestPipelineImports(unittest.TestCase):
     """Test that all modules can be imported"""
     
+    @classmethod
+    def setUpClass(cls):
+        """Construct the pipeline once for every test in the class"""
+        cls.pipeline, cls.pipeline_error = None, None
+        if ProstateADCRegistrationPipeline is not None:
+            try:
+                # This should work even without elastix installed
+                # (it will fail later when actually running registration)
+                cls.pipeline = ProstateADCRegistrationPipeline()
+            except ELASTIX_MISSING as e:
+                cls.pipeline_error = e
+    
     def test_base_pipeline_import(self):
         """Test base pipeline import"""
-        try:
-            from image_registration.pipeline.base_pipeline import BasePipeline, PipelineStep
-            self.assertTrue(True)
-        except ImportError as e:
-            self.fail(f"Failed to import base pipeline: {e}")
+        # An ImportError here fails the test with its own traceback
+        from image_registration.pipeline.base_pipeline import BasePipeline, PipelineStep
+        self.assertTrue(hasattr(BasePipeline, 'add_step'))
+        self.assertTrue(hasattr(PipelineStep, 'execute'))
     
     def test_pranav_pipeline_import(self):
         """Test Pranav's pipeline import"""
-        try:
-            from image_registration.pipeline.pranav_registration_pipeline import ProstateADCRegistrationPipeline
-            self.assertTrue(True)
-        except ImportError as e:
-            self.fail(f"Failed to import Pranav's pipeline: {e}")
+        if PIPELINE_IMPORT_ERROR is not None:
+            self.fail(f"Failed to import Pranav's pipeline: {PIPELINE_IMPORT_ERROR}")
     
     def test_pipeline_initialization(self):
         """Test pipeline can be initialized"""
-        try:
-            from image_registration.pipeline.pranav_registration_pipeline import ProstateADCRegistrationPipeline
-            # This should work even without elastix installed
-            # (it will fail later when actually running registration)
-            pipeline = ProstateADCRegistrationPipeline()
-            self.assertIsNotNone(pipeline)
-        except Exception as e:
+        if PIPELINE_IMPORT_ERROR is not None:
+            self.fail(f"Failed to import Pranav's pipeline: {PIPELINE_IMPORT_ERROR}")
+        if self.pipeline_error is not None:
             # Expected to fail if elastix not installed
-            self.assertIn("elastix", str(e).lower())
+            raise unittest.SkipTest(f"elastix unavailable: {self.pipeline_error}")
+        self.assertIsNotNone(self.pipeline)
 
 class TestDataStructure(unittest.TestCase):
     """Test data structure validation"""
     
     def test_path_handling(self):
         """Test Path handling works correctly"""
-        from pathlib import Path
-        test_path = Path("/test/path")
-        self.assertEqual(str(test_path), "/test/path")
+        cases = (
+            ("/test/path", "/test/path"),
+            ("/test/path/", "/test/path"),
+            ("/test//path", "/test/path"),
+            ("relative/path", "relative/path"),
+            ("/test/patient_01_t2w.nii.gz", "/test/patient_01_t2w.nii.gz"),
+        )
+        for raw, expected in cases:
+            with self.subTest(path=raw):
+                self.assertEqual(str(Path(raw)), expected)
+    
+    def test_patient_discovery(self):
+        """Test patient discovery matches the T2W/ADC naming conventions"""
+        cases = {
+            'patient_01': ('patient_01_t2w.nii.gz', 'patient_01_adc.nii.gz'),
+            'patient_02': ('patient_02_T2.nii.gz', 'patient_02_ADC.nii.gz'),
+            'patient_03': ('patient_03_t2w.nii.gz', None),
+            'patient_04': ('patient_04_t2w.nii', 'patient_04_adc.nii.gz'),
+        }
+        with tempfile.TemporaryDirectory() as base_dir:
+            for patient_id, names in cases.items():
+                patient_dir = Path(base_dir) / patient_id
+                patient_dir.mkdir()
+                for name in filter(None, names):
+                    (patient_dir / name).touch()
+            
+            found = PatientDiscoveryStep().execute({'base_directory': base_dir})
+        
+        patients = {p['patient_id']: p for p in found['patients']}
+        self.assertEqual(sorted(patients), ['patient_01', 'patient_02'])
+        for patient_id, (t2w_name, adc_name) in cases.items():
+            if patient_id not in patients:
+                continue
+            with self.subTest(patient=patient_id):
+                self.assertEqual(Path(patients[patient_id]['t2w_path']).name, t2w_name)
+                self.assertEqual(Path(patients[patient_id]['adc_path']).name, adc_name)
 
 if __name__ == '__main__':
     unittest.main()